@@ -8,6 +8,13 @@ import tempfile
 from pathlib import Path
 import sys
 
+# Optional libuv-backed event loop; the default loop is used when unavailable
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 # Add lib to path
 sys.path.insert(0, str(Path(__file__).parent))
 
@@ -27,34 +34,34 @@ async def main():
         print(f"\n📁 Creating demo files in {tmpdir}...")
         
         # Python files
-        (Path(tmpdir) / "main.py").write_text(
-            "def main():\n    print('Hello World')\n\nif __name__ == '__main__':\n    main()\n"
+        (Path(tmpdir) / "main.py").write_bytes(
+            b"def main():\n    print('Hello World')\n\nif __name__ == '__main__':\n    main()\n"
         )
         
-        (Path(tmpdir) / "utils.py").write_text(
-            "def helper():\n    return 42\n"
+        (Path(tmpdir) / "utils.py").write_bytes(
+            b"def helper():\n    return 42\n"
         )
         
         # Create subdirectory
         subdir = Path(tmpdir) / "tests"
         subdir.mkdir()
         
-        (subdir / "test_main.py").write_text(
-            "import pytest\n\ndef test_main():\n    assert True\n"
+        (subdir / "test_main.py").write_bytes(
+            b"import pytest\n\ndef test_main():\n    assert True\n"
         )
         
-        (subdir / "test_utils.py").write_text(
-            "from utils import helper\n\ndef test_helper():\n    assert helper() == 42\n"
+        (subdir / "test_utils.py").write_bytes(
+            b"from utils import helper\n\ndef test_helper():\n    assert helper() == 42\n"
         )
         
         # Documentation
-        (Path(tmpdir) / "README.md").write_text(
-            "# Demo Project\n\nThis is a demo.\n"
+        (Path(tmpdir) / "README.md").write_bytes(
+            b"# Demo Project\n\nThis is a demo.\n"
         )
         
         # Config file
-        (Path(tmpdir) / "config.json").write_text(
-            '{"version": "1.0.0", "debug": true}\n'
+        (Path(tmpdir) / "config.json").write_bytes(
+            b'{"version": "1.0.0", "debug": true}\n'
         )
         
         print("✅ Demo files created")
@@ -7,8 +7,12 @@ Backward compatible with simple_mcp.py.
 import sys
 import json
 import asyncio
+import hashlib
 import logging
 import os
+import re
+import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any, Dict, Optional, List
 from datetime import datetime
@@ -16,36 +20,51 @@ import uuid
 
 from dotenv import load_dotenv
 
+# Optional C-accelerated JSON codec; fall back to stdlib when unavailable
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional libuv-backed event loop; the default loop is used when unavailable
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    uvloop = None
+
 # Add lib to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from lib import GrokClient
-from lib.tools import (
-    AskTool,
-    DiscussTool,
-    SessionManager,
-    ListSessionsTool,
-    ContinueSessionTool,
-    AskWithContextTool,
-    HealthCheckTool
-)
+# Resolved lazily in setup_tools (keeps openai/httpx off the import path);
+# module-level so tests can patch enhanced_mcp.GrokClient
+GrokClient = None
 
-# Load .env
-load_dotenv(Path(__file__).parent / '.env')
+# Load .env - read the small file in one pass instead of through
+# dotenv's buffered text I/O
+_env_path = Path(__file__).parent / '.env'
+if _env_path.is_file():
+    import io
+    load_dotenv(stream=io.StringIO(_env_path.read_bytes().decode('utf-8')))
 
 # Configure logging
 log_level = os.getenv('MCP_LOG_LEVEL', 'INFO')
 log_file = os.getenv('MCP_LOG_FILE', 'enhanced_mcp.log')
 
+_main_handler = logging.FileHandler(log_file)
+# Error log only receives ERROR and above instead of duplicating every record
+_error_handler = logging.FileHandler('mcp_errors.log', mode='a')
+_error_handler.setLevel(logging.ERROR)
+
 logging.basicConfig(
     level=getattr(logging, log_level),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        # Also log errors to a separate file
-        logging.FileHandler('mcp_errors.log', mode='a')
-    ]
+    handlers=[_main_handler, _error_handler]
 )
+# Skip collecting thread/process metadata we never log
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 logger = logging.getLogger(__name__)
 
 # Global instances
@@ -53,18 +72,33 @@ grok_client = None
 session_manager = None
 tools = {}
 resources = {}
-cache = {}
+cache = OrderedDict()  # LRU order: oldest entry first
 cache_size = 0  # Track total cache size in bytes
 max_cache_size = None  # Will be initialized from env
+max_cache_entries = None  # Will be initialized from env
 streaming_enabled = False
 
 
+def _json_dumps(obj: Any) -> str:
+    """Serialize to a JSON string, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj)
+
+
+def _json_loads(data: 'str | bytes') -> Any:
+    """Parse JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 class EnhancedMCPServer:
     """Enhanced MCP server with full feature set."""
     
     def __init__(self):
         """Initialize the enhanced server."""
-        global max_cache_size
+        global max_cache_size, max_cache_entries
         self.initialized = False
         self.capabilities = self._build_capabilities()
         self.setup_tools()
@@ -72,7 +106,29 @@ class EnhancedMCPServer:
         self.request_count = 0
         self.error_count = 0
         self.start_time = datetime.now()
+        # O(1) method dispatch instead of an if/elif cascade per request
+        self._dispatch = {
+            "initialize": self.handle_initialize,
+            "tools/list": lambda rid, params: self.handle_tools_list(rid),
+            "tools/call": self.handle_tool_call,
+            "resources/list": lambda rid, params: self.handle_resources_list(rid),
+            "resources/read": self.handle_resource_read,
+        }
         max_cache_size = int(os.getenv('MAX_CACHE_SIZE_MB', '100')) * 1024 * 1024
+        max_cache_entries = int(os.getenv('MCP_CACHE_MAX_ENTRIES', '1024'))
+        # Parse env-derived config once instead of per tools/call
+        self.cache_enabled = os.getenv('MCP_ENABLE_CACHING', 'true').lower() == 'true'
+        self.cache_ttl = int(os.getenv('MCP_CACHE_TTL', '3600'))
+        self.max_response_tokens = int(os.getenv('MCP_MAX_RESPONSE_TOKENS', '40000'))
+        self.max_tokens = int(os.getenv('GROK_MAX_TOKENS', '4096'))
+        self._stats_cache = None  # (monotonic timestamp, stats dict)
+        self._in_flight = {}  # cache_key -> Future for in-progress tool calls
+        self.features = {
+            "sessions": os.getenv('ENABLE_SESSIONS', 'true').lower() == 'true',
+            "context": os.getenv('ENABLE_CONTEXT', 'true').lower() == 'true',
+            "resources": os.getenv('ENABLE_RESOURCES', 'true').lower() == 'true',
+            "health": os.getenv('ENABLE_HEALTH_CHECK', 'true').lower() == 'true'
+        }
         logger.info(f"EnhancedMCPServer created at {self.start_time}")
     
     def _build_capabilities(self) -> Dict[str, Any]:
@@ -99,13 +155,27 @@ class EnhancedMCPServer:
     
     def setup_tools(self):
         """Initialize all tools."""
-        global grok_client, session_manager, tools
-        
+        global grok_client, session_manager, tools, GrokClient
+
+        # Deferred so the openai/httpx import cost is paid here, not at
+        # module load
+        if GrokClient is None:
+            from lib import GrokClient
+        from lib.tools import (
+            AskTool,
+            DiscussTool,
+            SessionManager,
+            ListSessionsTool,
+            ContinueSessionTool,
+            AskWithContextTool,
+            HealthCheckTool
+        )
+
         # Initialize clients
-        model = os.getenv('GROK_MODEL', 'grok-code-fast')
-        temperature = float(os.getenv('GROK_TEMPERATURE', '0.7'))
-        
-        grok_client = GrokClient(model=model, temperature=temperature)
+        self.model = os.getenv('GROK_MODEL', 'grok-code-fast')
+        self.temperature = float(os.getenv('GROK_TEMPERATURE', '0.7'))
+
+        grok_client = GrokClient(model=self.model, temperature=self.temperature)
         session_manager = SessionManager(Path("./sessions"))
         
         # Initialize tools
@@ -120,7 +190,12 @@ class EnhancedMCPServer:
         
         for tool in tool_instances:
             tools[tool.name] = tool
-        
+
+        # Tools never change after setup, so build the tools/list result once
+        self._tools_list_result = {
+            "tools": [tool.to_mcp_tool() for tool in tools.values()]
+        }
+
         logger.info(f"Initialized {len(tools)} tools")
     
     def setup_resources(self):
@@ -145,51 +220,57 @@ class EnhancedMCPServer:
             }
         }
         
+        # Resources are static too; build the resources/list result once
+        self._resources_list_result = {
+            "resources": [
+                {
+                    "uri": uri,
+                    "name": res["name"],
+                    "description": res["description"],
+                    "mimeType": res["mimeType"]
+                }
+                for uri, res in resources.items()
+            ]
+        }
+
         logger.info(f"Initialized {len(resources)} resources")
     
-    async def handle_request(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Handle a single request."""
+    async def handle_request(self, request: Dict[str, Any]) -> Optional[Any]:
+        """Handle a single request.
+
+        Returns a response dict, a pre-serialized JSON string (for cached
+        tool results), or None for notifications.
+        """
         method = request.get("method")
         params = request.get("params", {})
         request_id = request.get("id")
         
         self.request_count += 1
-        logger.debug(f"Request #{self.request_count}: {method}")
+        logger.debug("Request #%d: %s", self.request_count, method)
         
         try:
-            # Protocol methods
-            if method == "initialize":
-                return await self.handle_initialize(request_id, params)
-            elif method == "initialized":
+            if method == "initialized":
+                # Notification, no response
                 logger.info("Client confirmed initialization")
-                return None  # Notification, no response
-            
-            # Tool methods
-            elif method == "tools/list":
-                return await self.handle_tools_list(request_id)
-            elif method == "tools/call":
-                return await self.handle_tool_call(request_id, params)
-            
-            # Resource methods
-            elif method == "resources/list":
-                return await self.handle_resources_list(request_id)
-            elif method == "resources/read":
-                return await self.handle_resource_read(request_id, params)
-            
+                return None
+
+            handler = self._dispatch.get(method)
+            if handler is not None:
+                return await handler(request_id, params)
+
             # Unknown method
-            else:
-                logger.warning(f"Unknown method: {method}")
-                if request_id is not None:
-                    return {
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "error": {
-                            "code": -32601,
-                            "message": f"Method not found: {method}"
-                        }
+            logger.warning(f"Unknown method: {method}")
+            if request_id is not None:
+                return {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "error": {
+                        "code": -32601,
+                        "message": f"Method not found: {method}"
                     }
-                return None
-                
+                }
+            return None
+
         except Exception as e:
             self.error_count += 1
             logger.error(f"Error handling request: {e}", exc_info=True)
@@ -227,14 +308,10 @@ class EnhancedMCPServer:
     
     async def handle_tools_list(self, request_id: int) -> Dict[str, Any]:
         """Handle tools/list request."""
-        tool_list = [tool.to_mcp_tool() for tool in tools.values()]
-        
         return {
             "jsonrpc": "2.0",
             "id": request_id,
-            "result": {
-                "tools": tool_list
-            }
+            "result": self._tools_list_result
         }
     
     async def handle_tool_call(self, request_id: int, params: Dict[str, Any]) -> Dict[str, Any]:
@@ -259,51 +336,96 @@ class EnhancedMCPServer:
                 # For now, fall back to non-streaming
                 arguments["stream"] = False
             
-            # Execute the tool
             tool = tools[tool_name]
-            result = await tool.execute(**arguments)
-            
+
             # Check cache for repeated questions (Phase 5)
-            cache_key = f"{tool_name}:{json.dumps(arguments, sort_keys=True)}"
-            cache_enabled = os.getenv('MCP_ENABLE_CACHING', 'true').lower() == 'true'
+            if orjson is not None:
+                key_payload = orjson.dumps([tool_name, arguments], option=orjson.OPT_SORT_KEYS)
+            else:
+                key_payload = json.dumps([tool_name, arguments], sort_keys=True).encode('utf-8')
+            # Fixed 16-byte digest instead of a potentially multi-KB key string
+            cache_key = hashlib.blake2b(key_payload, digest_size=16).digest()
+            cache_enabled = self.cache_enabled
             cache_hit = False
-            
-            if cache_key in cache and cache_enabled:
+            result = None
+
+            # Boolean gate first so disabled caching skips the dict probe;
+            # the 16-byte digest keys already make the probe itself cheap
+            if cache_enabled and cache_key in cache:
                 cache_entry = cache[cache_key]
-                if (datetime.now() - cache_entry['timestamp']).seconds < int(os.getenv('MCP_CACHE_TTL', '3600')):
-                    logger.debug(f"Cache hit for {cache_key}")
+                if time.monotonic() - cache_entry['timestamp'] < self.cache_ttl:
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Cache hit for %s (%s)", tool_name, cache_key.hex())
+                    cache.move_to_end(cache_key)  # Mark as most recently used
+                    # Repeat hits can reuse the serialized result payload and
+                    # skip json.dumps entirely (only the request id differs)
+                    if cache_entry.get('serialized') is not None:
+                        return ('{"jsonrpc": "2.0", "id": ' + _json_dumps(request_id)
+                                + ', "result": ' + cache_entry['serialized'] + '}')
                     result = cache_entry['result']
                     cache_hit = True
                 else:
                     # Remove expired entry
                     self._remove_from_cache(cache_key)
+
+            if not cache_hit:
+                # Single-flight: concurrent identical calls share one execution
+                # instead of each hitting the Grok API
+                in_flight = self._in_flight.get(cache_key)
+                if in_flight is not None:
+                    result = await asyncio.shield(in_flight)
+                else:
+                    future = asyncio.get_running_loop().create_future()
+                    self._in_flight[cache_key] = future
+                    try:
+                        result = await tool.execute(**arguments)
+                    except Exception as e:
+                        if not future.cancelled():
+                            future.set_exception(e)
+                            # Suppress "exception never retrieved" if nobody joined
+                            future.exception()
+                        raise
+                    else:
+                        if not future.cancelled():
+                            future.set_result(result)
+                    finally:
+                        del self._in_flight[cache_key]
+
+                    if cache_enabled:
+                        # Check if adding to cache would exceed size limit
+                        self._add_to_cache(cache_key, result)
             
-            if not cache_hit and cache_enabled:
-                # Check if adding to cache would exceed size limit
-                self._add_to_cache(cache_key, result)
-            
-            # Check response size and truncate if necessary
-            max_response_tokens = int(os.getenv('MCP_MAX_RESPONSE_TOKENS', '40000'))
-            estimated_tokens = self._estimate_tokens(result)
-            
-            if estimated_tokens > max_response_tokens:
+            # Check response size and truncate if necessary; the cheap length
+            # gate keeps the common (in-budget) case free of any extra work
+            max_response_tokens = self.max_response_tokens
+            if len(result) > max_response_tokens * 4:
+                estimated_tokens = self._estimate_tokens(result)
                 logger.warning(f"Response size ({estimated_tokens} tokens) exceeds limit ({max_response_tokens} tokens). Truncating...")
                 result = self._truncate_response(result, max_response_tokens)
                 result += f"\n\n[Response truncated. Original size: ~{estimated_tokens} tokens, limit: {max_response_tokens} tokens]"
             
+            result_payload = {
+                "content": [
+                    {
+                        "type": "text",
+                        "text": result
+                    }
+                ]
+            }
+
+            # Memoize the serialized (post-truncation) payload so later cache
+            # hits write it straight out without re-encoding
+            if cache_enabled:
+                entry = cache.get(cache_key)
+                if entry is not None and entry.get('serialized') is None:
+                    entry['serialized'] = _json_dumps(result_payload)
+
             return {
                 "jsonrpc": "2.0",
                 "id": request_id,
-                "result": {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": result
-                        }
-                    ]
-                }
+                "result": result_payload
             }
-            
+
         except Exception as e:
             logger.error(f"Error executing tool {tool_name}: {e}", exc_info=True)
             return {
@@ -317,22 +439,10 @@ class EnhancedMCPServer:
     
     async def handle_resources_list(self, request_id: int) -> Dict[str, Any]:
         """Handle resources/list request."""
-        resource_list = [
-            {
-                "uri": uri,
-                "name": res["name"],
-                "description": res["description"],
-                "mimeType": res["mimeType"]
-            }
-            for uri, res in resources.items()
-        ]
-        
         return {
             "jsonrpc": "2.0",
             "id": request_id,
-            "result": {
-                "resources": resource_list
-            }
+            "result": self._resources_list_result
         }
     
     async def handle_resource_read(self, request_id: int, params: Dict[str, Any]) -> Dict[str, Any]:
@@ -385,31 +495,32 @@ class EnhancedMCPServer:
             }
         elif uri == "grok://config":
             return {
-                "model": os.getenv('GROK_MODEL', 'grok-code-fast'),
-                "temperature": float(os.getenv('GROK_TEMPERATURE', '0.7')),
-                "max_tokens": int(os.getenv('GROK_MAX_TOKENS', '4096')),
+                "model": self.model,
+                "temperature": self.temperature,
+                "max_tokens": self.max_tokens,
                 "streaming": streaming_enabled,
-                "caching": os.getenv('MCP_ENABLE_CACHING', 'true').lower() == 'true',
-                "cache_ttl": int(os.getenv('MCP_CACHE_TTL', '3600')),
-                "features": {
-                    "sessions": os.getenv('ENABLE_SESSIONS', 'true').lower() == 'true',
-                    "context": os.getenv('ENABLE_CONTEXT', 'true').lower() == 'true',
-                    "resources": os.getenv('ENABLE_RESOURCES', 'true').lower() == 'true',
-                    "health": os.getenv('ENABLE_HEALTH_CHECK', 'true').lower() == 'true'
-                }
+                "caching": self.cache_enabled,
+                "cache_ttl": self.cache_ttl,
+                "features": self.features
             }
         elif uri == "grok://stats":
+            # Memoize briefly so rapid pollers don't redo the arithmetic
+            now = time.monotonic()
+            if self._stats_cache is not None and now - self._stats_cache[0] < 1.0:
+                return self._stats_cache[1]
+
             uptime = (datetime.now() - self.start_time).total_seconds()
-            return {
+            stats = {
                 "requests": self.request_count,
                 "errors": self.error_count,
                 "error_rate": self.error_count / max(1, self.request_count),
                 "uptime_seconds": int(uptime),
                 "tokens_used": grok_client.get_total_tokens_used() if grok_client else 0,
                 "cache_size": len(cache),
-                "active_sessions": len([s for s in session_manager.sessions.values() 
-                                      if s.get("status") == "active"]) if session_manager else 0
+                "active_sessions": session_manager.active_count() if session_manager else 0
             }
+            self._stats_cache = (now, stats)
+            return stats
         else:
             raise ValueError(f"Unknown resource: {uri}")
     
@@ -421,70 +532,76 @@ class EnhancedMCPServer:
         """
         return len(text) // 4
     
+    # Paragraph breaks and sentence ends, matched in one pass
+    _BOUNDARY_RE = re.compile(r'\n\n|[.!?] ')
+
     def _truncate_response(self, text: str, max_tokens: int) -> str:
         """Truncate response to fit within token limit.
-        
+
         Attempts to truncate at a reasonable boundary (paragraph or sentence).
         """
         # Estimate character limit based on token limit
         char_limit = max_tokens * 4
-        
+
         if len(text) <= char_limit:
             return text
-        
-        # Try to find a good truncation point
+
+        # Try to find a good truncation point - scan only the last 20% and
+        # collect paragraph and sentence boundaries in a single pass
         truncated = text[:char_limit]
-        
-        # Look for the last paragraph break
-        last_paragraph = truncated.rfind('\n\n')
-        if last_paragraph > char_limit * 0.8:  # If we found a paragraph break in the last 20%
+        last_paragraph = -1
+        last_sentence = -1
+        for match in self._BOUNDARY_RE.finditer(truncated, int(char_limit * 0.8)):
+            if match.group() == '\n\n':
+                last_paragraph = match.start()
+            else:
+                last_sentence = match.start()
+
+        # Prefer a paragraph break, then a sentence end
+        if last_paragraph != -1:
             return truncated[:last_paragraph]
-        
-        # Look for the last sentence
-        last_sentence = max(
-            truncated.rfind('. '),
-            truncated.rfind('! '),
-            truncated.rfind('? ')
-        )
-        if last_sentence > char_limit * 0.8:
+        if last_sentence != -1:
             return truncated[:last_sentence + 1]
-        
+
         # Fall back to simple truncation
         return truncated + "..."
     
-    def _add_to_cache(self, key: str, value: str):
+    def _add_to_cache(self, key: bytes, value: str):
         """Add an item to cache with size management."""
         global cache, cache_size, max_cache_size
         
-        # Calculate size of new entry
-        entry = {'result': value, 'timestamp': datetime.now()}
-        # Convert datetime to string for JSON serialization
-        entry_json = {'result': value, 'timestamp': entry['timestamp'].isoformat()}
-        entry_size = len(json.dumps(entry_json))
-        
-        # Check if we need to evict entries to make room
-        while cache and (cache_size + entry_size > max_cache_size):
-            # Find and remove oldest entry
-            oldest_key = min(cache.keys(), key=lambda k: cache[k]['timestamp'])
-            self._remove_from_cache(oldest_key)
-            logger.debug(f"Evicted cache entry {oldest_key} to free space")
-        
-        # Add new entry
+        # Size the entry by the UTF-8 length of the result string; the result
+        # dominates the entry so there is no need to JSON-encode it just to measure
+        entry = {'result': value, 'serialized': None, 'timestamp': time.monotonic(),
+                 'size': len(value.encode('utf-8'))}
+
+        # Evict least-recently-used entries (front of the OrderedDict) to make
+        # room - bounded both by total bytes and by entry count
+        while cache and (cache_size + entry['size'] > max_cache_size
+                         or len(cache) >= max_cache_entries):
+            oldest_key, oldest_entry = cache.popitem(last=False)
+            cache_size = max(0, cache_size - oldest_entry['size'])  # Ensure non-negative
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Evicted cache entry %s to free space", oldest_key.hex())
+
+        # Add new entry as most recently used
         cache[key] = entry
-        cache_size += entry_size
-        logger.debug(f"Added to cache: {key}, cache size now {cache_size / 1024:.1f} KB")
-    
-    def _remove_from_cache(self, key: str):
+        cache.move_to_end(key)
+        cache_size += entry['size']
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Added to cache: %s, cache size now %.1f KB", key.hex(), cache_size / 1024)
+
+    def _remove_from_cache(self, key: bytes):
         """Remove an item from cache and update size."""
         global cache, cache_size
-        
+
         if key in cache:
-            # Convert datetime to string for JSON serialization
-            entry = cache[key]
-            entry_json = {'result': entry['result'], 'timestamp': entry['timestamp'].isoformat() if hasattr(entry['timestamp'], 'isoformat') else str(entry['timestamp'])}
-            entry_size = len(json.dumps(entry_json))
-            del cache[key]
-            cache_size = max(0, cache_size - entry_size)  # Ensure non-negative
+            entry = cache.pop(key)
+            cache_size = max(0, cache_size - entry['size'])  # Ensure non-negative
+
+
+# Allow large single-line requests (e.g. big context_files payloads)
+STDIN_READ_LIMIT = 10 * 1024 * 1024
 
 
 async def main():
@@ -492,106 +609,145 @@ async def main():
     server = EnhancedMCPServer()
     logger.info("Starting enhanced MCP server main loop")
 
-    # Set up async stdin reading
-    reader = asyncio.StreamReader()
+    # Set up async stdin reading - readline() blocks until data arrives,
+    # so there is no polling wakeup on idle connections
+    reader = asyncio.StreamReader(limit=STDIN_READ_LIMIT)
     protocol = asyncio.StreamReaderProtocol(reader)
     use_async = False
 
     try:
-        await asyncio.get_event_loop().connect_read_pipe(lambda: protocol, sys.stdin)
+        await asyncio.get_running_loop().connect_read_pipe(lambda: protocol, sys.stdin)
         use_async = True
         logger.info("Using async stdin reader")
     except Exception as e:
-        # Fallback for systems that don't support async pipes
-        logger.info(f"Async pipe not available ({e}), using sync fallback")
+        # Rare platforms (e.g. Windows) can't connect pipes to the loop;
+        # read stdin from a worker thread instead of polling select()
+        logger.info(f"Async pipe not available ({e}), reading stdin via thread")
+
+    stdout_buf = sys.stdout.buffer
+    # Reused across responses so steady-state writes don't reallocate;
+    # write_lock makes the sharing safe
+    out_buf = bytearray()
+    write_lock = asyncio.Lock()
+    max_inflight = int(os.getenv('MCP_MAX_INFLIGHT', '8'))
+    inflight = asyncio.BoundedSemaphore(max_inflight)
+    tasks = set()
+    stop = asyncio.Event()
+
+    # True while a written response is sitting unflushed in stdout_buf
+    flush_pending = False
+
+    def more_input_buffered() -> bool:
+        """Whether another complete request line is already buffered."""
+        return use_async and b'\n' in getattr(reader, '_buffer', b'')
+
+    async def write_response(response_bytes: bytes, method: str):
+        """Write one response; stdout access is serialized by write_lock."""
+        nonlocal flush_pending
+        async with write_lock:
+            try:
+                out_buf.clear()
+                out_buf.extend(response_bytes)
+                out_buf.append(0x0A)
+                stdout_buf.write(out_buf)
+                # Batch-flush: defer the flush when more pipelined requests
+                # are already waiting in the read buffer
+                if more_input_buffered():
+                    flush_pending = True
+                else:
+                    stdout_buf.flush()
+                    flush_pending = False
+                logger.debug("Sent response for method: %s", method)
+            except BrokenPipeError:
+                logger.error("Broken pipe - client disconnected while sending response")
+                stop.set()
+            except Exception as e:
+                logger.error(f"Error writing response: {e}", exc_info=True)
+                stop.set()
+
+    async def flush_if_pending():
+        """Flush any response deferred by the batching heuristic.
 
-    buffer = ""
-    consecutive_empty_reads = 0
-    max_empty_reads = 50  # Allow up to 5 seconds of empty reads (50 * 0.1s)
+        A deferred flush is normally carried by the next response, but
+        lines that yield none (notifications, cancels, unparsable input)
+        must not leave an earlier response stranded in the buffer.
+        """
+        nonlocal flush_pending
+        async with write_lock:
+            if not flush_pending:
+                return
+            try:
+                stdout_buf.flush()
+                flush_pending = False
+            except BrokenPipeError:
+                logger.error("Broken pipe - client disconnected while flushing")
+                stop.set()
+            except Exception as e:
+                logger.error(f"Error flushing responses: {e}", exc_info=True)
+                stop.set()
 
-    while True:
+    async def process_line(line):
+        """Parse and handle one request, then write its response."""
+        wrote_response = False
         try:
-            chunk_received = False
+            try:
+                request = _json_loads(line)
+            except json.JSONDecodeError as e:
+                logger.error(f"JSON decode error: {e}, line: {line[:100]}")
+                return
 
-            # Try async read
-            if use_async:
-                try:
-                    chunk = await asyncio.wait_for(reader.read(1024), timeout=0.1)
-                    if chunk:
-                        buffer += chunk.decode('utf-8')
-                        chunk_received = True
-                        consecutive_empty_reads = 0
-                    elif len(chunk) == 0 and reader.at_eof():
-                        # EOF detected - stdin was closed
-                        logger.warning("stdin closed (EOF detected) - client disconnected")
-                        break
-                except asyncio.TimeoutError:
-                    # Normal timeout, no data available
-                    pass
-                except Exception as e:
-                    logger.error(f"Error reading from async stdin: {e}", exc_info=True)
-                    use_async = False  # Fall back to sync
-
-            # Fallback to sync read
-            if not use_async:
-                import select
-                try:
-                    if select.select([sys.stdin], [], [], 0.1)[0]:
-                        line = sys.stdin.readline()
-                        if line:
-                            buffer += line
-                            chunk_received = True
-                            consecutive_empty_reads = 0
-                        else:
-                            # Empty readline() means EOF
-                            logger.warning("stdin closed (EOF on readline) - client disconnected")
-                            break
-                except Exception as e:
-                    logger.error(f"Error reading from sync stdin: {e}", exc_info=True)
-
-            # Track consecutive empty reads to detect stalled connections
-            if not chunk_received:
-                consecutive_empty_reads += 1
-                if consecutive_empty_reads >= max_empty_reads:
-                    logger.warning(f"No data received for {max_empty_reads * 0.1}s, checking connection health")
-                    # Reset counter and continue - this is normal for idle connections
-                    consecutive_empty_reads = 0
-
-            # Process complete JSON objects
-            while buffer:
-                try:
-                    if '\n' in buffer:
-                        line, buffer = buffer.split('\n', 1)
-                        if line.strip():
-                            request = json.loads(line)
-                            logger.debug(f"Received: {request}")
-
-                            # Handle request
-                            response = await server.handle_request(request)
-
-                            # Send response if not a notification
-                            if response:
-                                response_str = json.dumps(response)
-                                try:
-                                    sys.stdout.write(response_str + '\n')
-                                    sys.stdout.flush()
-                                    logger.debug(f"Sent response for method: {request.get('method', 'unknown')}")
-                                except BrokenPipeError:
-                                    logger.error("Broken pipe - client disconnected while sending response")
-                                    return
-                                except Exception as e:
-                                    logger.error(f"Error writing response: {e}", exc_info=True)
-                                    return
-                    else:
-                        break
+            # Lazy %-formatting so the (possibly multi-KB)
+            # request repr is only built at DEBUG level
+            logger.debug("Received: %s", request)
+
+            # Handle request
+            response = await server.handle_request(request)
 
-                except json.JSONDecodeError as e:
-                    logger.error(f"JSON decode error: {e}, buffer: {buffer[:100]}")
-                    buffer = ""  # Clear bad buffer
+            # Send response if not a notification
+            if response:
+                # Cached tool results arrive pre-serialized
+                if isinstance(response, str):
+                    response_bytes = response.encode('utf-8')
+                elif orjson is not None:
+                    response_bytes = orjson.dumps(response)
+                else:
+                    response_bytes = json.dumps(response).encode('utf-8')
+                await write_response(response_bytes, request.get('method', 'unknown'))
+                wrote_response = True
+        except Exception as e:
+            logger.error(f"Processing error: {e}", exc_info=True)
+        finally:
+            if not wrote_response:
+                # This line carried no response to piggyback the deferred
+                # flush on, so flush explicitly
+                await flush_if_pending()
+            inflight.release()
+
+    while not stop.is_set():
+        try:
+            if use_async:
+                # json.loads/orjson.loads accept bytes directly, so the raw
+                # line never needs an intermediate str decode
+                line = await reader.readline()
+                if not line:
+                    logger.warning("stdin closed (EOF detected) - client disconnected")
+                    break
+            else:
+                line = await asyncio.to_thread(sys.stdin.readline)
+                if not line:
+                    logger.warning("stdin closed (EOF on readline) - client disconnected")
                     break
-                except Exception as e:
-                    logger.error(f"Processing error: {e}", exc_info=True)
-                    # Don't break - continue processing other requests
+
+            if not line.strip():
+                continue
+
+            # Dispatch each request as its own task so a slow upstream call
+            # doesn't head-of-line-block the rest; the semaphore bounds how
+            # many tool executions run at once
+            await inflight.acquire()
+            task = asyncio.create_task(process_line(line))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
 
         except KeyboardInterrupt:
             logger.info("Shutdown requested via KeyboardInterrupt")
@@ -599,12 +755,23 @@ async def main():
         except BrokenPipeError:
             logger.error("Broken pipe in main loop - client disconnected")
             break
+        except ValueError as e:
+            # readline() raises ValueError when a line exceeds the limit
+            logger.error(f"Oversized or invalid input line: {e}")
         except Exception as e:
             logger.error(f"Main loop error: {e}", exc_info=True)
             # Continue running unless it's a fatal error
             import traceback
             traceback.print_exc()
 
+    # Let in-flight requests finish and flush anything still buffered
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+    try:
+        stdout_buf.flush()
+    except Exception:
+        pass
+
     logger.info("Server stopped gracefully")
 
 
@@ -0,0 +1 @@
+"""Grok MCP server package; run with `python -m grok_mcp` or the `grok-mcp` script."""
@@ -2,17 +2,28 @@
 Baseline Generator - Creates structured baseline documents for complex discussions.
 """
 
+import asyncio
+import hashlib
+import sys
+import json
+from collections import OrderedDict, defaultdict
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from dataclasses import dataclass
 import logging
 
-from .context_analyzer import ContextItem
+from .context_analyzer import ContextItem, _get_token_encoder
+
+# Optional fast JSON; the stdlib json module is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class BaselineSection:
     """Represents a section of the baseline document."""
     title: str
@@ -25,17 +36,294 @@ class BaselineSection:
             self.token_estimate = len(self.content) // 4
 
 
+# Static section bodies keyed by question type, built once at import so
+# generate() does a dict lookup instead of re-concatenating constants
+_REQUIREMENTS_TEMPLATES = {
+    "implementation": """## Technical Requirements
+
+### Functional Requirements
+- Primary functionality to be implemented
+- User interactions and workflows
+- Data inputs and outputs
+- Integration points
+
+### Non-Functional Requirements
+- Performance expectations
+- Security considerations
+- Scalability needs
+- Maintainability standards""",
+    "debugging": """## Technical Requirements
+
+### Debugging Requirements
+- Error messages and stack traces
+- System state when error occurs
+- Expected vs actual behavior
+- Test cases to verify fix""",
+    "optimization": """## Technical Requirements
+
+### Performance Requirements
+- Current performance metrics
+- Target performance goals
+- Acceptable resource usage
+- Response time requirements""",
+    "general": """## Technical Requirements
+
+### General Requirements
+- Clear problem definition
+- Desired outcome
+- Constraints and limitations
+- Success metrics""",
+}
+
+_EXPERT_ARCHITECT_SECURITY = """## Expert Perspectives
+
+### Software Architect Perspective
+- **Architecture Impact**: How does this affect system architecture?
+- **Design Patterns**: What patterns could be applied?
+- **Scalability**: How will this scale with growth?
+- **Maintainability**: How can we ensure long-term maintainability?
+
+### Security Expert Perspective
+- **Security Risks**: What security vulnerabilities might this introduce?
+- **Data Protection**: How is sensitive data handled?
+- **Access Control**: What authorization is needed?
+- **Audit Trail**: What needs to be logged for security?
+
+"""
+
+_EXPERT_PERFORMANCE = """### Performance Engineer Perspective
+- **Performance Impact**: What is the performance cost?
+- **Optimization Opportunities**: Where can we optimize?
+- **Caching Strategy**: What can be cached?
+- **Resource Usage**: What resources are consumed?
+
+"""
+
+_EXPERT_QA = """### QA Engineer Perspective
+- **Testing Strategy**: How will this be tested?
+- **Edge Cases**: What edge cases need consideration?
+- **Test Coverage**: What coverage is needed?
+- **Regression Risk**: What existing functionality might be affected?"""
+
+_EXPERT_TEMPLATES = {
+    qt: (_EXPERT_ARCHITECT_SECURITY
+         + (_EXPERT_PERFORMANCE if qt in ("implementation", "optimization") else "")
+         + _EXPERT_QA)
+    for qt in ("implementation", "debugging", "optimization", "general")
+}
+
+_APPROACH_TEMPLATES = {
+    "implementation": """## Proposed Approach
+
+### Implementation Strategy
+1. **Planning Phase**
+   - Define clear requirements
+   - Design component interfaces
+   - Identify dependencies
+
+2. **Development Phase**
+   - Implement core functionality
+   - Write unit tests
+   - Handle error cases
+
+3. **Testing Phase**
+   - Run unit tests
+   - Perform integration testing
+   - Validate edge cases
+
+4. **Deployment Phase**
+   - Code review
+   - Documentation update
+   - Deployment preparation""",
+    "debugging": """## Proposed Approach
+
+### Debugging Strategy
+1. **Reproduce the Issue**
+   - Identify steps to reproduce
+   - Isolate the problem area
+   - Gather error information
+
+2. **Root Cause Analysis**
+   - Analyze stack traces
+   - Check recent changes
+   - Review related components
+
+3. **Develop Fix**
+   - Implement targeted solution
+   - Add defensive coding
+   - Include error handling
+
+4. **Verify Solution**
+   - Test the fix
+   - Check for regressions
+   - Validate edge cases""",
+    "optimization": """## Proposed Approach
+
+### Optimization Strategy
+1. **Measure Current State**
+   - Profile performance
+   - Identify bottlenecks
+   - Establish baseline metrics
+
+2. **Analyze Opportunities**
+   - Algorithm improvements
+   - Caching possibilities
+   - Resource optimization
+
+3. **Implement Improvements**
+   - Apply optimizations
+   - Maintain functionality
+   - Add performance tests
+
+4. **Validate Results**
+   - Measure improvements
+   - Compare to targets
+   - Check for side effects""",
+    "general": """## Proposed Approach
+
+### General Approach
+1. **Analysis**
+   - Understand the problem
+   - Gather requirements
+   - Research solutions
+
+2. **Design**
+   - Plan the solution
+   - Consider alternatives
+   - Choose best approach
+
+3. **Implementation**
+   - Build the solution
+   - Test thoroughly
+   - Document clearly
+
+4. **Validation**
+   - Verify requirements met
+   - Get feedback
+   - Iterate if needed""",
+}
+
+_QUESTIONS_TYPE_BLOCKS = {
+    "implementation": """### Implementation Questions
+1. What is the best architectural pattern for this implementation?
+2. How should error handling be structured?
+3. What external dependencies are acceptable?
+4. How can we ensure the code is testable and maintainable?
+5. What performance considerations should be addressed upfront?
+
+""",
+    "debugging": """### Debugging Questions
+1. What is the exact error message and stack trace?
+2. When did this issue first appear?
+3. What recent changes might have caused this?
+4. Can this be reproduced consistently?
+5. What is the impact on users or system functionality?
+
+""",
+    "optimization": """### Optimization Questions
+1. What are the current performance metrics?
+2. What is the target performance goal?
+3. Which operations are the bottlenecks?
+4. What trade-offs are acceptable?
+5. How will we measure success?
+
+""",
+}
+
+_QUESTIONS_GENERAL = """### General Considerations
+1. What are the main risks or challenges?
+2. Are there existing solutions or patterns to consider?
+3. What is the timeline for this work?
+4. Who are the stakeholders?
+5. What documentation is needed?"""
+
+_QUESTIONS_TEMPLATES = {
+    qt: "## Key Questions for Discussion\n\n" + _QUESTIONS_TYPE_BLOCKS.get(qt, "") + _QUESTIONS_GENERAL
+    for qt in ("implementation", "debugging", "optimization", "general")
+}
+
+_SUCCESS_FOOTER = """
+
+### Secondary Success Indicators
+- Clear understanding of trade-offs
+- Knowledge transfer completed
+- Future improvements identified
+- Lessons learned documented
+- Team alignment achieved"""
+
+_SUCCESS_TEMPLATES = {
+    "implementation": """## Success Criteria
+
+### Primary Success Metrics
+- [ ] Feature is fully implemented and working
+- [ ] All unit tests pass
+- [ ] Code is reviewed and approved
+- [ ] Documentation is updated
+- [ ] No regression in existing functionality""" + _SUCCESS_FOOTER,
+    "debugging": """## Success Criteria
+
+### Primary Success Metrics
+- [ ] Bug is identified and fixed
+- [ ] Root cause is understood
+- [ ] Fix is tested and verified
+- [ ] No new issues introduced
+- [ ] Prevention measures documented""" + _SUCCESS_FOOTER,
+    "optimization": """## Success Criteria
+
+### Primary Success Metrics
+- [ ] Performance targets are met
+- [ ] No functionality is broken
+- [ ] Improvements are measurable
+- [ ] Resource usage is acceptable
+- [ ] Solution is sustainable""" + _SUCCESS_FOOTER,
+    "general": """## Success Criteria
+
+### Primary Success Metrics
+- [ ] Problem is clearly understood
+- [ ] Solution is well-designed
+- [ ] Implementation is complete
+- [ ] Quality standards are met
+- [ ] Stakeholders are satisfied""" + _SUCCESS_FOOTER,
+}
+
+
 class BaselineGenerator:
     """Generates structured baseline documents for Grok discussions."""
-    
+
+    # Bounded LRU cache for generated documents; sessions often re-ask
+    # similar topics and regeneration from identical inputs is pure waste
+    _MEMO_MAX_ENTRIES = 64
+
     def __init__(self, token_budget: int = 10000):
         """Initialize baseline generator.
-        
+
         Args:
             token_budget: Maximum tokens for baseline document
         """
         self.token_budget = token_budget
-        
+        self._memo: OrderedDict = OrderedDict()
+
+    def _memo_key(
+        self,
+        topic: str,
+        analysis: Dict[str, Any],
+        context_items: List[ContextItem],
+        use_expert_mode: bool
+    ) -> bytes:
+        """Stable 16-byte digest of everything that shapes the document."""
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(topic.encode("utf-8"))
+        if orjson is not None:
+            # orjson emits bytes, feeding the hasher without an encode step
+            hasher.update(orjson.dumps(analysis, option=orjson.OPT_SORT_KEYS, default=str))
+        else:
+            hasher.update(json.dumps(analysis, sort_keys=True, default=str).encode("utf-8"))
+        hasher.update(str(sorted(
+            (item.path, item.relevance_score) for item in context_items
+        )).encode("utf-8"))
+        hasher.update(bytes([use_expert_mode]))
+        return hasher.digest()
+
     async def generate(
         self,
         topic: str,
@@ -54,88 +342,115 @@ class BaselineGenerator:
         Returns:
             Formatted baseline document
         """
-        logger.info(f"Generating baseline document for topic: {topic}")
-        
-        sections = []
-        
-        # 1. Executive Summary
-        sections.append(BaselineSection(
-            title="Executive Summary",
-            content=self._create_executive_summary(topic, analysis),
-            priority=1
-        ))
-        
-        # 2. Problem Analysis
-        sections.append(BaselineSection(
-            title="Problem Analysis",
-            content=self._analyze_problem(topic, analysis),
-            priority=1
-        ))
-        
-        # 3. Current Context
+        memo_key = self._memo_key(topic, analysis, context_items, use_expert_mode)
+        cached = self._memo.get(memo_key)
+        if cached is not None:
+            self._memo.move_to_end(memo_key)
+            return cached
+
+        logger.info("Generating baseline document for topic: %s", topic)
+
+        # The whole build is CPU-bound string work; run it in a worker
+        # thread so concurrent Grok I/O on the event loop keeps progressing
+        document = await asyncio.to_thread(
+            self._generate_sync, topic, analysis, context_items, use_expert_mode
+        )
+
+        self._memo[memo_key] = document
+        while len(self._memo) > self._MEMO_MAX_ENTRIES:
+            self._memo.popitem(last=False)
+        return document
+
+    def _generate_sync(
+        self,
+        topic: str,
+        analysis: Dict[str, Any],
+        context_items: List[ContextItem],
+        use_expert_mode: bool
+    ) -> str:
+        """Synchronous document build; runs off the event loop."""
+        # One timestamp per document; the summary and header share it
+        now = datetime.now()
+
+        # Budget-first planning: each entry carries a cheap token estimate so
+        # builders for sections that cannot fit are never invoked at all
+        plan = [
+            ("Executive Summary", 1,
+             lambda: self._create_executive_summary(topic, analysis, now), 120),
+            ("Problem Analysis", 1,
+             lambda: self._analyze_problem(topic, analysis), 200),
+        ]
+
         if context_items:
-            sections.append(BaselineSection(
-                title="Current Implementation Context",
-                content=self._summarize_context(context_items),
-                priority=2
-            ))
-        
-        # 4. Technical Requirements
-        sections.append(BaselineSection(
-            title="Technical Requirements",
-            content=self._extract_requirements(topic, analysis),
-            priority=2
-        ))
-        
-        # 5. Expert Perspectives (if enabled)
+            # Context summarization walks every item; estimate from item count
+            plan.append(("Current Implementation Context", 2,
+                         lambda: self._summarize_context(context_items),
+                         30 + 40 * min(len(context_items), 25)))
+
+        plan.append(("Technical Requirements", 2,
+                     lambda: self._extract_requirements(topic, analysis), 120))
+
         if use_expert_mode:
-            sections.append(BaselineSection(
-                title="Expert Perspectives",
-                content=self._gather_expert_perspectives(topic, analysis),
-                priority=3
-            ))
-        
-        # 6. Proposed Approach
-        sections.append(BaselineSection(
-            title="Proposed Approach",
-            content=self._suggest_approach(topic, analysis),
-            priority=2
-        ))
-        
-        # 7. Key Questions
-        sections.append(BaselineSection(
-            title="Key Questions for Discussion",
-            content=self._generate_questions(topic, analysis),
-            priority=1
-        ))
-        
-        # 8. Success Criteria
-        sections.append(BaselineSection(
-            title="Success Criteria",
-            content=self._define_success_criteria(topic, analysis),
-            priority=2
-        ))
-        
+            plan.append(("Expert Perspectives", 3,
+                         lambda: self._gather_expert_perspectives(topic, analysis), 300))
+
+        plan.extend([
+            ("Proposed Approach", 2,
+             lambda: self._suggest_approach(topic, analysis), 200),
+            ("Key Questions for Discussion", 1,
+             lambda: self._generate_questions(topic, analysis), 250),
+            ("Success Criteria", 2,
+             lambda: self._define_success_criteria(topic, analysis), 150),
+        ])
+
+        # Bucket by priority instead of sorting; document order is kept
+        # within a priority level and the budget walk stops once spent, with
+        # the first section past the budget still built as the truncation
+        # candidate
+        priority_buckets: Dict[int, list] = {1: [], 2: [], 3: []}
+        for entry in plan:
+            priority_buckets[entry[1]].append(entry)
+        plan = [entry for bucket in priority_buckets.values() for entry in bucket]
+
+        selected = []
+        used_estimate = 60  # Rough header cost
+        for title, priority, builder, cheap_estimate in plan:
+            over_budget = used_estimate + cheap_estimate > self.token_budget
+            selected.append((title, priority, builder))
+            used_estimate += cheap_estimate
+            if over_budget:
+                break
+
+        # Already off the event loop, so the selected builders run inline;
+        # a per-builder thread hop would cost more than these template
+        # lookups save
+        sections = [
+            BaselineSection(title=title, content=builder(), priority=priority)
+            for title, priority, builder in selected
+        ]
+
         # Assemble document within token budget
-        return self._assemble_document(sections, topic)
-    
-    def _create_executive_summary(self, topic: str, analysis: Dict[str, Any]) -> str:
+        return self._assemble_document(sections, topic, now)
+
+    def _create_executive_summary(self, topic: str, analysis: Dict[str, Any],
+                                  now: Optional[datetime] = None) -> str:
         """Create an executive summary of the discussion topic.
-        
+
         Args:
             topic: Discussion topic
             analysis: Question analysis
-            
+            now: Generation timestamp (defaults to the current time)
+
         Returns:
             Executive summary content
         """
-        question_type = analysis.get("type", "general")
+        question_type = sys.intern(analysis.get("type", "general"))
         keywords = analysis.get("keywords", [])
-        
+
         summary = f"""This document analyzes the following topic:
 **"{topic}"**
 
-**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+**Generated**: {(now or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')}
 **Question Type**: {question_type.capitalize()}
 **Key Focus Areas**: {', '.join(keywords[:5]) if keywords else 'General discussion'}
 
@@ -154,55 +469,55 @@ with Grok-4, ensuring all relevant context and considerations are captured."""
         Returns:
             Problem analysis content
         """
-        question_type = analysis.get("type", "general")
+        question_type = sys.intern(analysis.get("type", "general"))
         entities = analysis.get("entities", {})
-        
-        content = f"""## Problem Statement
+
+        parts = [f"""## Problem Statement
 {topic}
 
 ## Analysis Type
-This appears to be a **{question_type}** question."""
-        
+This appears to be a **{question_type}** question."""]
+
         if question_type == "implementation":
-            content += """
+            parts.append("""
 
 ### Implementation Considerations
 - **Scope**: What components need to be created or modified?
 - **Dependencies**: What existing systems will this interact with?
 - **Constraints**: What limitations or requirements must be met?
-- **Performance**: What performance characteristics are expected?"""
-        
+- **Performance**: What performance characteristics are expected?""")
+
         elif question_type == "debugging":
-            content += """
+            parts.append("""
 
 ### Debugging Approach
 - **Symptoms**: What specific errors or unexpected behaviors are occurring?
 - **Reproduction**: Can the issue be consistently reproduced?
 - **Impact**: What functionality is affected?
-- **Timeline**: When did the issue first appear?"""
-        
+- **Timeline**: When did the issue first appear?""")
+
         elif question_type == "optimization":
-            content += """
+            parts.append("""
 
 ### Optimization Goals
 - **Current Performance**: What are the current metrics?
 - **Target Performance**: What improvements are needed?
 - **Bottlenecks**: What are the likely performance bottlenecks?
-- **Trade-offs**: What trade-offs are acceptable?"""
-        
+- **Trade-offs**: What trade-offs are acceptable?""")
+
         # Add entity information if present
         if any(entities.values()):
-            content += "\n\n### Identified Components"
+            parts.append("\n\n### Identified Components")
             if entities.get("functions"):
-                content += f"\n- **Functions**: {', '.join(entities['functions'])}"
+                parts.append(f"\n- **Functions**: {', '.join(entities['functions'])}")
             if entities.get("classes"):
-                content += f"\n- **Classes**: {', '.join(entities['classes'])}"
+                parts.append(f"\n- **Classes**: {', '.join(entities['classes'])}")
             if entities.get("files"):
-                content += f"\n- **Files**: {', '.join(entities['files'])}"
+                parts.append(f"\n- **Files**: {', '.join(entities['files'])}")
             if entities.get("modules"):
-                content += f"\n- **Modules**: {', '.join(entities['modules'])}"
-        
-        return content
+                parts.append(f"\n- **Modules**: {', '.join(entities['modules'])}")
+
+        return "".join(parts)
     
     def _summarize_context(self, context_items: List[ContextItem]) -> str:
         """Summarize the gathered context.
@@ -213,32 +528,34 @@ This appears to be a **{question_type}** question."""
         Returns:
             Context summary
         """
-        content = "## Available Context\n\n"
-        content += f"**Total Context Items**: {len(context_items)}\n"
-        content += f"**Estimated Tokens**: {sum(item.token_estimate for item in context_items)}\n\n"
-        
-        # Group by type
-        by_type = {}
+        # Single pass: total the token estimates while grouping by type
+        total_tokens = 0
+        by_type = defaultdict(list)
         for item in context_items:
-            if item.type not in by_type:
-                by_type[item.type] = []
+            total_tokens += item.token_estimate
             by_type[item.type].append(item)
-        
+
+        parts = [
+            "## Available Context\n\n",
+            f"**Total Context Items**: {len(context_items)}\n",
+            f"**Estimated Tokens**: {total_tokens}\n\n",
+        ]
+
         for item_type, items in by_type.items():
-            content += f"\n### {item_type.capitalize()} Context ({len(items)} items)\n"
+            parts.append(f"\n### {item_type.capitalize()} Context ({len(items)} items)\n")
             for item in items[:5]:  # Show top 5 per type
-                content += f"- **{item.path}** (relevance: {item.relevance_score:.2f})\n"
-                
+                parts.append(f"- **{item.path}** (relevance: {item.relevance_score:.2f})\n")
+
                 # Add brief preview if available
                 if item.metadata.get("extension") in [".py", ".js", ".ts"]:
-                    # Extract first function or class if possible
-                    lines = item.content.split('\n')[:10]
-                    preview = '\n'.join(lines[:3])
+                    # Extract first function or class if possible; bounded
+                    # split only scans the head of the content
+                    preview = '\n'.join(item.content.split('\n', 3)[:3])
                     if len(preview) > 100:
                         preview = preview[:100] + "..."
-                    content += f"  ```\n  {preview}\n  ```\n"
-        
-        return content
+                    parts.append(f"  ```\n  {preview}\n  ```\n")
+
+        return "".join(parts)
     
     def _extract_requirements(self, topic: str, analysis: Dict[str, Any]) -> str:
         """Extract technical requirements from the topic.
@@ -250,45 +567,8 @@ This appears to be a **{question_type}** question."""
         Returns:
             Requirements content
         """
-        question_type = analysis.get("type", "general")
-        
-        content = "## Technical Requirements\n\n"
-        
-        if question_type == "implementation":
-            content += """### Functional Requirements
-- Primary functionality to be implemented
-- User interactions and workflows
-- Data inputs and outputs
-- Integration points
-
-### Non-Functional Requirements
-- Performance expectations
-- Security considerations
-- Scalability needs
-- Maintainability standards"""
-        
-        elif question_type == "debugging":
-            content += """### Debugging Requirements
-- Error messages and stack traces
-- System state when error occurs
-- Expected vs actual behavior
-- Test cases to verify fix"""
-        
-        elif question_type == "optimization":
-            content += """### Performance Requirements
-- Current performance metrics
-- Target performance goals
-- Acceptable resource usage
-- Response time requirements"""
-        
-        else:
-            content += """### General Requirements
-- Clear problem definition
-- Desired outcome
-- Constraints and limitations
-- Success metrics"""
-        
-        return content
+        question_type = sys.intern(analysis.get("type", "general"))
+        return _REQUIREMENTS_TEMPLATES.get(question_type, _REQUIREMENTS_TEMPLATES["general"])
     
     def _gather_expert_perspectives(self, topic: str, analysis: Dict[str, Any]) -> str:
         """Gather multiple expert perspectives on the topic.
@@ -300,46 +580,8 @@ This appears to be a **{question_type}** question."""
         Returns:
             Expert perspectives content
         """
-        question_type = analysis.get("type", "general")
-        
-        content = "## Expert Perspectives\n\n"
-        
-        # Software Architect perspective
-        content += """### Software Architect Perspective
-- **Architecture Impact**: How does this affect system architecture?
-- **Design Patterns**: What patterns could be applied?
-- **Scalability**: How will this scale with growth?
-- **Maintainability**: How can we ensure long-term maintainability?
-
-"""
-        
-        # Security Expert perspective
-        content += """### Security Expert Perspective
-- **Security Risks**: What security vulnerabilities might this introduce?
-- **Data Protection**: How is sensitive data handled?
-- **Access Control**: What authorization is needed?
-- **Audit Trail**: What needs to be logged for security?
-
-"""
-        
-        # Performance Engineer perspective
-        if question_type in ["implementation", "optimization"]:
-            content += """### Performance Engineer Perspective
-- **Performance Impact**: What is the performance cost?
-- **Optimization Opportunities**: Where can we optimize?
-- **Caching Strategy**: What can be cached?
-- **Resource Usage**: What resources are consumed?
-
-"""
-        
-        # QA Engineer perspective
-        content += """### QA Engineer Perspective
-- **Testing Strategy**: How will this be tested?
-- **Edge Cases**: What edge cases need consideration?
-- **Test Coverage**: What coverage is needed?
-- **Regression Risk**: What existing functionality might be affected?"""
-        
-        return content
+        question_type = sys.intern(analysis.get("type", "general"))
+        return _EXPERT_TEMPLATES.get(question_type, _EXPERT_TEMPLATES["general"])
     
     def _suggest_approach(self, topic: str, analysis: Dict[str, Any]) -> str:
         """Suggest an approach to addressing the topic.
@@ -351,99 +593,8 @@ This appears to be a **{question_type}** question."""
         Returns:
             Suggested approach content
         """
-        question_type = analysis.get("type", "general")
-        
-        content = "## Proposed Approach\n\n"
-        
-        if question_type == "implementation":
-            content += """### Implementation Strategy
-1. **Planning Phase**
-   - Define clear requirements
-   - Design component interfaces
-   - Identify dependencies
-
-2. **Development Phase**
-   - Implement core functionality
-   - Write unit tests
-   - Handle error cases
-
-3. **Testing Phase**
-   - Run unit tests
-   - Perform integration testing
-   - Validate edge cases
-
-4. **Deployment Phase**
-   - Code review
-   - Documentation update
-   - Deployment preparation"""
-        
-        elif question_type == "debugging":
-            content += """### Debugging Strategy
-1. **Reproduce the Issue**
-   - Identify steps to reproduce
-   - Isolate the problem area
-   - Gather error information
-
-2. **Root Cause Analysis**
-   - Analyze stack traces
-   - Check recent changes
-   - Review related components
-
-3. **Develop Fix**
-   - Implement targeted solution
-   - Add defensive coding
-   - Include error handling
-
-4. **Verify Solution**
-   - Test the fix
-   - Check for regressions
-   - Validate edge cases"""
-        
-        elif question_type == "optimization":
-            content += """### Optimization Strategy
-1. **Measure Current State**
-   - Profile performance
-   - Identify bottlenecks
-   - Establish baseline metrics
-
-2. **Analyze Opportunities**
-   - Algorithm improvements
-   - Caching possibilities
-   - Resource optimization
-
-3. **Implement Improvements**
-   - Apply optimizations
-   - Maintain functionality
-   - Add performance tests
-
-4. **Validate Results**
-   - Measure improvements
-   - Compare to targets
-   - Check for side effects"""
-        
-        else:
-            content += """### General Approach
-1. **Analysis**
-   - Understand the problem
-   - Gather requirements
-   - Research solutions
-
-2. **Design**
-   - Plan the solution
-   - Consider alternatives
-   - Choose best approach
-
-3. **Implementation**
-   - Build the solution
-   - Test thoroughly
-   - Document clearly
-
-4. **Validation**
-   - Verify requirements met
-   - Get feedback
-   - Iterate if needed"""
-        
-        return content
+        question_type = sys.intern(analysis.get("type", "general"))
+        return _APPROACH_TEMPLATES.get(question_type, _APPROACH_TEMPLATES["general"])
     
     def _generate_questions(self, topic: str, analysis: Dict[str, Any]) -> str:
         """Generate key questions for the discussion.
@@ -455,54 +606,17 @@ This appears to be a **{question_type}** question."""
         Returns:
             Questions content
         """
-        question_type = analysis.get("type", "general")
+        question_type = sys.intern(analysis.get("type", "general"))
         keywords = analysis.get("keywords", [])
-        
-        content = "## Key Questions for Discussion\n\n"
-        
-        # Type-specific questions
-        if question_type == "implementation":
-            content += """### Implementation Questions
-1. What is the best architectural pattern for this implementation?
-2. How should error handling be structured?
-3. What external dependencies are acceptable?
-4. How can we ensure the code is testable and maintainable?
-5. What performance considerations should be addressed upfront?
 
-"""
-        elif question_type == "debugging":
-            content += """### Debugging Questions
-1. What is the exact error message and stack trace?
-2. When did this issue first appear?
-3. What recent changes might have caused this?
-4. Can this be reproduced consistently?
-5. What is the impact on users or system functionality?
-
-"""
-        elif question_type == "optimization":
-            content += """### Optimization Questions
-1. What are the current performance metrics?
-2. What is the target performance goal?
-3. Which operations are the bottlenecks?
-4. What trade-offs are acceptable?
-5. How will we measure success?
+        content = _QUESTIONS_TEMPLATES.get(question_type, _QUESTIONS_TEMPLATES["general"])
 
-"""
-        
-        # General questions
-        content += """### General Considerations
-1. What are the main risks or challenges?
-2. Are there existing solutions or patterns to consider?
-3. What is the timeline for this work?
-4. Who are the stakeholders?
-5. What documentation is needed?"""
-        
         # Add keyword-specific questions if relevant
         if keywords:
-            content += f"\n\n### Topic-Specific Questions\n"
+            content += "\n\n### Topic-Specific Questions\n"
             for i, keyword in enumerate(keywords[:3], 1):
                 content += f"{i}. How does this relate to {keyword}?\n"
-        
+
         return content
     
     def _define_success_criteria(self, topic: str, analysis: Dict[str, Any]) -> str:
@@ -515,94 +629,80 @@ This appears to be a **{question_type}** question."""
         Returns:
             Success criteria content
         """
-        question_type = analysis.get("type", "general")
-        
-        content = "## Success Criteria\n\n"
-        
-        content += "### Primary Success Metrics\n"
-        
-        if question_type == "implementation":
-            content += """- [ ] Feature is fully implemented and working
-- [ ] All unit tests pass
-- [ ] Code is reviewed and approved
-- [ ] Documentation is updated
-- [ ] No regression in existing functionality"""
-        
-        elif question_type == "debugging":
-            content += """- [ ] Bug is identified and fixed
-- [ ] Root cause is understood
-- [ ] Fix is tested and verified
-- [ ] No new issues introduced
-- [ ] Prevention measures documented"""
-        
-        elif question_type == "optimization":
-            content += """- [ ] Performance targets are met
-- [ ] No functionality is broken
-- [ ] Improvements are measurable
-- [ ] Resource usage is acceptable
-- [ ] Solution is sustainable"""
-        
-        else:
-            content += """- [ ] Problem is clearly understood
-- [ ] Solution is well-designed
-- [ ] Implementation is complete
-- [ ] Quality standards are met
-- [ ] Stakeholders are satisfied"""
-        
-        content += """
-
-### Secondary Success Indicators
-- Clear understanding of trade-offs
-- Knowledge transfer completed
-- Future improvements identified
-- Lessons learned documented
-- Team alignment achieved"""
-        
-        return content
+        question_type = sys.intern(analysis.get("type", "general"))
+        return _SUCCESS_TEMPLATES.get(question_type, _SUCCESS_TEMPLATES["general"])
     
-    def _assemble_document(self, sections: List[BaselineSection], topic: str) -> str:
+    def _assemble_document(self, sections: List[BaselineSection], topic: str,
+                           now: Optional[datetime] = None) -> str:
         """Assemble the final baseline document within token budget.
-        
+
         Args:
-            sections: List of document sections
+            sections: List of document sections, already in priority order
             topic: Discussion topic
-            
+            now: Generation timestamp (defaults to the current time)
+
         Returns:
             Assembled baseline document
         """
-        # Sort sections by priority
-        sections.sort(key=lambda x: x.priority)
-        
+        # Replace the heuristic estimates with real token counts when a
+        # tokenizer is available; one batched encode covers all sections and
+        # the token ids are kept so truncation can slice by token
+        encoder = _get_token_encoder()
+        section_ids = None
+        if encoder is not None:
+            section_ids = encoder.encode_batch([s.content for s in sections])
+            for section, ids in zip(sections, section_ids):
+                section.token_estimate = len(ids)
+
         # Start with header
-        document = f"# Baseline Document\n\n"
-        document += f"**Topic**: {topic}\n"
-        document += f"**Generated**: {datetime.now().isoformat()}\n"
-        document += f"**Document Version**: 1.0.0\n\n"
-        document += "---\n\n"
-        
+        header = (
+            f"# Baseline Document\n\n"
+            f"**Topic**: {topic}\n"
+            f"**Generated**: {(now or datetime.now()).isoformat()}\n"
+            f"**Document Version**: 1.0.0\n\n"
+            "---\n\n"
+        )
+        parts = [header]
+
         # Calculate header tokens
-        used_tokens = len(document) // 4
-        
+        if encoder is not None:
+            used_tokens = len(encoder.encode(header))
+        else:
+            used_tokens = len(header) // 4
+
         # Add sections within budget
-        for section in sections:
+        for index, section in enumerate(sections):
             if used_tokens + section.token_estimate <= self.token_budget:
-                document += f"## {section.title}\n\n"
-                document += section.content
-                document += "\n\n"
+                parts.append(f"## {section.title}\n\n")
+                parts.append(section.content)
+                parts.append("\n\n")
                 used_tokens += section.token_estimate
             else:
-                # Try to add truncated version
+                # Try to add truncated version; reuse the original string
+                # when the prefix would cover it, so no copy is allocated
                 remaining_tokens = self.token_budget - used_tokens
                 if remaining_tokens > 200:
-                    truncated = section.content[:remaining_tokens * 4]
-                    document += f"## {section.title}\n\n"
-                    document += truncated
-                    document += "\n... (section truncated to fit token budget)\n\n"
+                    if section_ids is not None:
+                        # Token-accurate prefix from the batch encoded above
+                        ids = section_ids[index]
+                        if remaining_tokens >= len(ids):
+                            truncated = section.content
+                        else:
+                            truncated = encoder.decode(ids[:remaining_tokens])
+                    else:
+                        remaining_chars = remaining_tokens * 4
+                        if remaining_chars >= len(section.content):
+                            truncated = section.content
+                        else:
+                            truncated = section.content[:remaining_chars]
+                    parts.append(f"## {section.title}\n\n")
+                    parts.append(truncated)
+                    parts.append("\n... (section truncated to fit token budget)\n\n")
                     break
-        
+
         # Add footer
-        document += "---\n\n"
-        document += f"*Document contains approximately {used_tokens} tokens*\n"
-        
-        logger.info(f"Generated baseline document with {used_tokens} tokens")
-        return document
\ No newline at end of file
+        parts.append("---\n\n")
+        parts.append(f"*Document contains approximately {used_tokens} tokens*\n")
+
+        logger.info("Generated baseline document with %d tokens", used_tokens)
+        return "".join(parts)
\ No newline at end of file
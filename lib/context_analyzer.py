@@ -2,8 +2,11 @@
 Context Analyzer - Intelligent context detection with NLP enhancement.
 """
 
+import copy
+import heapq
 import os
 import re
+import time
 import asyncio
 import aiofiles
 from pathlib import Path
@@ -11,10 +14,63 @@ from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import logging
 import json
-from collections import Counter
+from collections import Counter, OrderedDict
+
+# Optional multi-pattern matcher; per-keyword count() scans are the fallback
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Optional accurate tokenizer; the len//4 heuristic is used when unavailable
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
 
 logger = logging.getLogger(__name__)
 
+_token_encoder = None
+_token_encoder_failed = False
+
+
+def _get_token_encoder():
+    """Return a cached cl100k_base encoder, or None if tiktoken is unusable."""
+    global _token_encoder, _token_encoder_failed
+    if _token_encoder is None and tiktoken is not None and not _token_encoder_failed:
+        try:
+            _token_encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            # get_encoding may need to fetch vocabulary data; degrade quietly
+            logger.warning("tiktoken encoder unavailable (%s), using heuristic counts", e)
+            _token_encoder_failed = True
+    return _token_encoder
+
+# Entity/file-reference patterns are constant; compile once at import
+_FUNC_RE = re.compile(r'\b([a-z_][a-zA-Z0-9_]*|[a-z][a-zA-Z0-9]*)\s*\(')
+_CLASS_RE = re.compile(r'\b([A-Z][a-zA-Z0-9]+)\b')
+_FILE_RE = re.compile(r'([a-zA-Z0-9_\-]+\.[a-zA-Z0-9]+)')
+_MODULE_RE = re.compile(r'\b([a-z_][a-z0-9_]*(?:\.[a-z_][a-z0-9_]*)+)\b')
+_PATH_RE = re.compile(r'(?:[.\/\\])?(?:[a-zA-Z0-9_\-]+[\/\\])*[a-zA-Z0-9_\-]+\.[a-zA-Z0-9]+')
+_NAME_RE = re.compile(r'\b(test_|spec_|config|settings|main|index|app)\w*\b', re.IGNORECASE)
+_WORD_RE = re.compile(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b')
+_PATH_TOKEN_RE = re.compile(r'[/_\-.\\]')
+
+# Directories never worth walking for context (hidden dirs are skipped
+# separately via their leading dot)
+_IGNORED_DIRS = frozenset({'node_modules', '__pycache__', 'venv'})
+
+# Text file types considered for keyword relevance
+_ALLOWED_EXTS = ('.py', '.js', '.ts', '.json', '.yaml', '.md', '.txt')
+
+# Common words dropped during keyword extraction
+_STOP_WORDS = frozenset({
+    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for",
+    "of", "with", "by", "from", "as", "is", "was", "are", "were", "been",
+    "be", "have", "has", "had", "do", "does", "did", "will", "would",
+    "could", "should", "may", "might", "must", "can", "shall", "need"
+})
+
 
 @dataclass
 class ContextItem:
@@ -40,6 +96,8 @@ class ContextItem:
 class ContextAnalyzer:
     """Analyzes questions and gathers intelligent context."""
     
+    _ANALYSIS_CACHE_MAX_ENTRIES = 128
+
     def __init__(self, project_root: Optional[Path] = None, token_budget: int = 10000):
         """Initialize context analyzer.
         
@@ -49,7 +107,25 @@ class ContextAnalyzer:
         """
         self.project_root = project_root or Path.cwd()
         self.token_budget = token_budget
-        
+
+        # Lazily built project file index of (rel_path, filename_lower,
+        # path_lower); rebuilt when the root mtime changes or the TTL lapses
+        self._file_index: Optional[List[Tuple[str, str, str]]] = None
+        self._index_paths: frozenset = frozenset()
+        # Inverted index: path token -> positions in _file_index
+        self._token_to_entries: Dict[str, set] = {}
+        self._index_built_at = 0.0
+        self._index_root_mtime = 0.0
+        self._index_ttl = 60.0
+
+        # Cap concurrent file reads so parallel loading can't exhaust fds
+        self._load_semaphore = asyncio.Semaphore(16)
+
+        # LRU memo of analyze_question results keyed by the question text;
+        # analysis is pure string work, so repeats can skip it entirely
+        self._analysis_cache: OrderedDict = OrderedDict()
+
+
         # Question type patterns
         self.question_patterns = {
             "implementation": [
@@ -99,6 +175,14 @@ class ContextAnalyzer:
             ]
         }
         
+        # Fuse all question patterns into one alternation with a named group
+        # per category, so _detect_question_type is a single pass over the
+        # question instead of one engine invocation per pattern
+        self._union_re = re.compile("|".join(
+            f"(?P<{q_type}>" + "|".join(f"(?:{p})" for p in patterns) + ")"
+            for q_type, patterns in self.question_patterns.items()
+        ))
+
         # File type associations
         self.file_associations = {
             "python": [".py", ".pyi"],
@@ -117,6 +201,13 @@ class ContextAnalyzer:
         Returns:
             Analysis results including type, keywords, entities
         """
+        cached = self._analysis_cache.get(question)
+        if cached is not None:
+            self._analysis_cache.move_to_end(question)
+            # Deep copy so callers can't mutate the cached entry; the dict
+            # is a handful of short lists, so this stays cheap
+            return copy.deepcopy(cached)
+
         analysis = {
             "question": question,
             "type": self._detect_question_type(question),
@@ -125,9 +216,13 @@ class ContextAnalyzer:
             "file_references": self._extract_file_references(question),
             "requires_code": self._requires_code_context(question)
         }
-        
+
+        self._analysis_cache[question] = analysis
+        if len(self._analysis_cache) > self._ANALYSIS_CACHE_MAX_ENTRIES:
+            self._analysis_cache.popitem(last=False)
+
         logger.debug(f"Question analysis: {analysis}")
-        return analysis
+        return copy.deepcopy(analysis)
     
     def _detect_question_type(self, question: str) -> str:
         """Detect the type of question.
@@ -139,18 +234,15 @@ class ContextAnalyzer:
             Question type
         """
         question_lower = question.lower()
-        scores = {}
-        
-        for q_type, patterns in self.question_patterns.items():
-            score = 0
-            for pattern in patterns:
-                if re.search(pattern, question_lower):
-                    score += 1
-            scores[q_type] = score
-        
+
+        # Tally which named group matched per hit in one linear scan
+        scores = Counter(
+            match.lastgroup for match in self._union_re.finditer(question_lower)
+        )
+
         # Return type with highest score, default to "general"
         if scores:
-            return max(scores, key=scores.get)
+            return scores.most_common(1)[0][0]
         return "general"
     
     def _extract_keywords(self, question: str) -> List[str]:
@@ -162,21 +254,15 @@ class ContextAnalyzer:
         Returns:
             List of keywords
         """
-        # Remove common words
-        stop_words = {
-            "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for",
-            "of", "with", "by", "from", "as", "is", "was", "are", "were", "been",
-            "be", "have", "has", "had", "do", "does", "did", "will", "would",
-            "could", "should", "may", "might", "must", "can", "shall", "need"
-        }
+        # Tokenize and filter; cheap length check first, then the frozenset
+        words = _WORD_RE.findall(question.lower())
+        keywords = [w for w in words if len(w) > 2 and w not in _STOP_WORDS]
         
-        # Tokenize and filter
-        words = re.findall(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', question.lower())
-        keywords = [w for w in words if w not in stop_words and len(w) > 2]
-        
-        # Count frequency and return top keywords
+        # Count frequency and take the top 10 with a bounded heap rather
+        # than sorting the whole vocabulary
         word_freq = Counter(keywords)
-        return [word for word, _ in word_freq.most_common(10)]
+        return [word for word, _ in
+                heapq.nlargest(10, word_freq.items(), key=lambda kv: kv[1])]
     
     def _extract_entities(self, question: str) -> Dict[str, List[str]]:
         """Extract entities like function names, classes, files.
@@ -195,20 +281,16 @@ class ContextAnalyzer:
         }
         
         # Function/method patterns (camelCase or snake_case followed by parentheses)
-        func_pattern = r'\b([a-z_][a-zA-Z0-9_]*|[a-z][a-zA-Z0-9]*)\s*\('
-        entities["functions"] = re.findall(func_pattern, question)
-        
+        entities["functions"] = _FUNC_RE.findall(question)
+
         # Class patterns (PascalCase)
-        class_pattern = r'\b([A-Z][a-zA-Z0-9]+)\b'
-        entities["classes"] = re.findall(class_pattern, question)
-        
+        entities["classes"] = _CLASS_RE.findall(question)
+
         # File patterns
-        file_pattern = r'([a-zA-Z0-9_\-]+\.[a-zA-Z0-9]+)'
-        entities["files"] = re.findall(file_pattern, question)
-        
+        entities["files"] = _FILE_RE.findall(question)
+
         # Module/package patterns (dot notation)
-        module_pattern = r'\b([a-z_][a-z0-9_]*(?:\.[a-z_][a-z0-9_]*)+)\b'
-        entities["modules"] = re.findall(module_pattern, question)
+        entities["modules"] = _MODULE_RE.findall(question)
         
         return entities
     
@@ -221,18 +303,15 @@ class ContextAnalyzer:
         Returns:
             List of file references
         """
-        files = []
-        
         # Direct file paths
-        path_pattern = r'(?:[.\/\\])?(?:[a-zA-Z0-9_\-]+[\/\\])*[a-zA-Z0-9_\-]+\.[a-zA-Z0-9]+'
-        files.extend(re.findall(path_pattern, question))
-        
+        files = _PATH_RE.findall(question)
+
         # File names without extension but with common prefixes
-        name_pattern = r'\b(test_|spec_|config|settings|main|index|app)\w*\b'
-        potential_files = re.findall(name_pattern, question, re.IGNORECASE)
-        files.extend(potential_files)
-        
-        return list(set(files))
+        files += _NAME_RE.findall(question)
+
+        # Ordered dedup keeps mention order stable for downstream slicing
+        seen = set()
+        return [f for f in files if not (f in seen or seen.add(f))]
     
     def _requires_code_context(self, question: str) -> bool:
         """Determine if the question requires code context.
@@ -266,40 +345,46 @@ class ContextAnalyzer:
         Returns:
             List of context items within token budget
         """
-        context_items = []
-        
+        # Collect candidate paths first (deduplicated, order preserved),
+        # then load them concurrently instead of one await per file
+        candidate_paths: List[str] = []
+        seen = set()
+
+        def add_candidate(path: str):
+            if path not in seen:
+                seen.add(path)
+                candidate_paths.append(path)
+
         # 1. Add specifically requested files
         if include_files:
             for file_path in include_files:
-                item = await self._load_file_context(file_path)
-                if item:
-                    context_items.append(item)
-        
+                add_candidate(file_path)
+
         # 2. Find files based on entities
         entities = analysis.get("entities", {})
         for file_ref in entities.get("files", []):
             files = await self._find_files_by_name(file_ref)
             for file_path in files[:3]:  # Limit to top 3 matches
-                item = await self._load_file_context(file_path)
-                if item:
-                    context_items.append(item)
-        
+                add_candidate(file_path)
+
         # 3. Find files based on keywords
         keywords = analysis.get("keywords", [])
         relevant_files = await self._find_relevant_files(keywords, analysis.get("type", "general"))
         for file_path in relevant_files[:5]:  # Top 5 relevant files
-            item = await self._load_file_context(file_path)
-            if item:
-                context_items.append(item)
-        
+            add_candidate(file_path)
+
         # 4. Add configuration files if needed
         if analysis.get("type") in ["implementation", "debugging"]:
             config_files = await self._find_config_files()
             for file_path in config_files[:2]:
-                item = await self._load_file_context(file_path)
-                if item:
-                    context_items.append(item)
-        
+                add_candidate(file_path)
+
+        results = await asyncio.gather(
+            *(self._load_file_context(path) for path in candidate_paths),
+            return_exceptions=True
+        )
+        context_items = [item for item in results if isinstance(item, ContextItem)]
+
         # 5. Score and prioritize context items
         scored_items = self._score_context_items(context_items, analysis)
         
@@ -323,13 +408,15 @@ class ContextAnalyzer:
             return None
         
         try:
-            async with aiofiles.open(full_path, 'r') as f:
-                content = await f.read()
-            
-            # Skip very large files
+            async with self._load_semaphore:
+                async with aiofiles.open(full_path, 'r') as f:
+                    # Bounded read: never pull more than the 50 KB cap (plus
+                    # one char to detect truncation) into memory
+                    content = await f.read(50001)
+
             if len(content) > 50000:
                 content = content[:50000] + "\n... (truncated)"
-            
+
             return ContextItem(
                 path=str(file_path),
                 content=content,
@@ -346,27 +433,76 @@ class ContextAnalyzer:
             logger.error(f"Failed to load file {file_path}: {e}")
             return None
     
+    async def _get_file_index(self) -> List[Tuple[str, str, str]]:
+        """Return the project file index, rebuilding it when stale.
+
+        Returns:
+            List of (relative_path, filename_lower, path_lower) tuples
+        """
+        now = time.monotonic()
+        try:
+            root_mtime = self.project_root.stat().st_mtime
+        except OSError:
+            root_mtime = 0.0
+
+        if (self._file_index is not None
+                and now - self._index_built_at < self._index_ttl
+                and root_mtime == self._index_root_mtime):
+            return self._file_index
+
+        index = []
+        token_to_entries: Dict[str, set] = {}
+        # Relative paths come from slicing the absolute path rather than
+        # allocating two Path objects per file
+        prefix_len = len(str(self.project_root)) + 1
+
+        def scan(dir_path: str) -> None:
+            # os.scandir surfaces the file type from the directory entry
+            # itself, so no per-entry stat call is needed
+            try:
+                entries = os.scandir(dir_path)
+            except OSError:
+                return
+            with entries:
+                for entry in entries:
+                    name = entry.name
+                    # Skip hidden entries and common ignore patterns
+                    if name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if name not in _IGNORED_DIRS:
+                            scan(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        rel_path = entry.path[prefix_len:]
+                        path_lower = rel_path.lower()
+                        position = len(index)
+                        index.append((rel_path, name.lower(), path_lower))
+                        for token in _PATH_TOKEN_RE.split(path_lower):
+                            if token:
+                                token_to_entries.setdefault(token, set()).add(position)
+
+        scan(str(self.project_root))
+
+        self._file_index = index
+        self._token_to_entries = token_to_entries
+        self._index_paths = frozenset(entry[0] for entry in index)
+        self._index_built_at = now
+        self._index_root_mtime = root_mtime
+        logger.debug("Indexed %d project files", len(index))
+        return index
+
     async def _find_files_by_name(self, name_pattern: str) -> List[str]:
         """Find files matching a name pattern.
-        
+
         Args:
             name_pattern: File name or pattern to search
-            
+
         Returns:
             List of file paths
         """
-        matches = []
-        
-        # Walk through project directory
-        for root, dirs, files in os.walk(self.project_root):
-            # Skip hidden directories and common ignore patterns
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['node_modules', '__pycache__', 'venv']]
-            
-            for file in files:
-                if name_pattern.lower() in file.lower():
-                    rel_path = Path(root) / file
-                    matches.append(str(rel_path.relative_to(self.project_root)))
-        
+        name_lower = name_pattern.lower()
+        matches = [path for path, filename, _ in await self._get_file_index()
+                   if name_lower in filename]
         return matches[:10]  # Limit results
     
     async def _find_relevant_files(self, keywords: List[str], question_type: str) -> List[str]:
@@ -392,36 +528,37 @@ class ContextAnalyzer:
         else:
             preferred_patterns = []
         
-        # Walk through project
-        for root, dirs, files in os.walk(self.project_root):
-            # Skip ignored directories
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['node_modules', '__pycache__', 'venv']]
-            
-            for file in files:
-                # Skip non-text files
-                if not any(file.endswith(ext) for ext in ['.py', '.js', '.ts', '.json', '.yaml', '.md', '.txt']):
-                    continue
-                
-                rel_path = Path(root) / file
-                file_path = str(rel_path.relative_to(self.project_root))
-                
-                # Calculate relevance score
-                score = 0
-                
-                # Check for keyword matches in filename
-                for keyword in keywords:
-                    if keyword.lower() in file.lower():
-                        score += 2
-                    if keyword.lower() in file_path.lower():
-                        score += 1
-                
-                # Boost for preferred patterns
-                for pattern in preferred_patterns:
-                    if pattern in file_path.lower():
-                        score += 3
-                
-                if score > 0:
-                    file_scores[file_path] = score
+        # Candidates come from the inverted index: O(keywords) set unions
+        # instead of substring checks across every file
+        index = await self._get_file_index()
+        keywords_lower = [keyword.lower() for keyword in keywords]
+        candidates: set = set()
+        for keyword in keywords_lower:
+            candidates |= self._token_to_entries.get(keyword, set())
+
+        for position in candidates:
+            file_path, filename, path_lower = index[position]
+            # Skip non-text files
+            if not filename.endswith(_ALLOWED_EXTS):
+                continue
+
+            # Calculate relevance score
+            score = 0
+
+            # Check for keyword matches in filename
+            for keyword in keywords_lower:
+                if keyword in filename:
+                    score += 2
+                if keyword in path_lower:
+                    score += 1
+
+            # Boost for preferred patterns
+            for pattern in preferred_patterns:
+                if pattern in path_lower:
+                    score += 3
+
+            if score > 0:
+                file_scores[file_path] = score
         
         # Sort by score and return top files
         sorted_files = sorted(file_scores.items(), key=lambda x: x[1], reverse=True)
@@ -440,11 +577,11 @@ class ContextAnalyzer:
             "settings.py", "config.py", "setup.py"
         ]
         
+        await self._get_file_index()
         for pattern in config_patterns:
-            file_path = self.project_root / pattern
-            if file_path.exists():
+            if pattern in self._index_paths:
                 config_files.append(pattern)
-        
+
         return config_files
     
     def _score_context_items(
@@ -461,23 +598,51 @@ class ContextAnalyzer:
         Returns:
             Sorted list of context items
         """
-        keywords = analysis.get("keywords", [])
-        entities = analysis.get("entities", {})
-        
+        # Lowercase keywords and flatten entities once, outside the item loop
+        keywords_lower = [keyword.lower() for keyword in analysis.get("keywords", [])]
+        entities_flat = [entity for entity_list in analysis.get("entities", {}).values()
+                         for entity in entity_list]
+
+        # One automaton scan per item instead of a count() pass per pattern;
+        # a word can be both keyword and entity, so tags are lists
+        automaton = None
+        if ahocorasick is not None and (keywords_lower or entities_flat):
+            word_tags: Dict[str, list] = {}
+            for keyword in keywords_lower:
+                word_tags.setdefault(keyword, []).append(("kw", keyword))
+            for entity in entities_flat:
+                word_tags.setdefault(entity.lower(), []).append(("ent", entity))
+            automaton = ahocorasick.Automaton()
+            for word, tags in word_tags.items():
+                automaton.add_word(word, tags)
+            automaton.make_automaton()
+
         for item in items:
             score = item.relevance_score
-            
-            # Score based on keyword matches in content
             content_lower = item.content.lower()
-            for keyword in keywords:
-                if keyword.lower() in content_lower:
-                    # Count occurrences (up to 5)
-                    count = min(content_lower.count(keyword.lower()), 5)
-                    score += count * 0.1
-            
-            # Score based on entity matches
-            for entity_list in entities.values():
-                for entity in entity_list:
+
+            if automaton is not None:
+                keyword_hits: Counter = Counter()
+                entity_hits = set()
+                for _, tags in automaton.iter(content_lower):
+                    for kind, key in tags:
+                        if kind == "kw":
+                            keyword_hits[key] += 1
+                        else:
+                            entity_hits.add(key)
+                for count in keyword_hits.values():
+                    score += min(count, 5) * 0.1
+                score += 0.3 * len(entity_hits)
+            else:
+                # Score based on keyword matches in content; a single count()
+                # both detects and tallies occurrences (capped at 5)
+                for keyword in keywords_lower:
+                    count = content_lower.count(keyword)
+                    if count:
+                        score += min(count, 5) * 0.1
+
+                # Score based on entity matches
+                for entity in entities_flat:
                     if entity in item.content:
                         score += 0.3
             
@@ -529,5 +694,8 @@ class ContextAnalyzer:
         Returns:
             Estimated token count
         """
+        encoder = _get_token_encoder()
+        if encoder is not None:
+            return len(encoder.encode(text))
         # Rough estimate: 1 token per 4 characters
         return len(text) // 4
\ No newline at end of file
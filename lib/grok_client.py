@@ -3,10 +3,14 @@ Grok Client - X.AI API wrapper with streaming and retry logic.
 """
 
 import asyncio
+import hashlib
+import io
 import os
+import random
 import time
+from collections import OrderedDict
 from typing import Optional, List, Dict, Any, AsyncGenerator
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import json
 import logging
 
@@ -14,6 +18,8 @@ from openai import AsyncOpenAI
 from openai.types.chat import ChatCompletionMessageParam
 import openai
 
+from .context_analyzer import _get_token_encoder
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,7 +44,19 @@ class GrokResponse:
 
 class GrokClient:
     """Client for interacting with X.AI's Grok API."""
-    
+
+    _BASE_URL = "https://api.x.ai/v1"
+
+    # Non-streaming completions at or below this temperature are treated
+    # as deterministic and eligible for the response cache
+    _CACHE_TEMPERATURE_MAX = 0.1
+    _RESPONSE_CACHE_MAX_ENTRIES = 64
+
+    # One AsyncOpenAI (and its underlying connection pool) per
+    # (api_key, base_url); GrokClient instances share warm sockets instead
+    # of opening a fresh TCP/TLS pool each
+    _client_cache: Dict[tuple, AsyncOpenAI] = {}
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -65,13 +83,55 @@ class GrokClient:
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         
-        self.client = AsyncOpenAI(
-            api_key=self.api_key,
-            base_url="https://api.x.ai/v1",
-        )
-        
+        cache_key = (self.api_key, self._BASE_URL)
+        client = GrokClient._client_cache.get(cache_key)
+        if client is None:
+            # AsyncOpenAI builds its own pooled httpx transport with
+            # keepalive limits at least as generous as the explicit ones
+            # this used to configure, so only the timeout needs setting
+            client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self._BASE_URL,
+                timeout=60,
+            )
+            GrokClient._client_cache[cache_key] = client
+        self.client = client
+
+
         self.total_tokens_used = 0
-        
+
+        # LRU of deterministic non-streaming responses keyed by request hash
+        self._response_cache: OrderedDict[str, GrokResponse] = OrderedDict()
+
+    @staticmethod
+    def _response_cache_key(
+        model: str,
+        temperature: float,
+        messages: List[ChatCompletionMessageParam],
+        max_tokens: Optional[int]
+    ) -> str:
+        """Build a stable hash key for a completion request.
+
+        Args:
+            model: Model the request targets
+            temperature: Sampling temperature for the request
+            messages: Messages being sent
+            max_tokens: Token limit for the response
+
+        Returns:
+            Hex digest identifying (model, temperature, messages, max_tokens)
+        """
+        payload = json.dumps(
+            {
+                "model": model,
+                "temperature": temperature,
+                "messages": messages,
+                "max_tokens": max_tokens,
+            },
+            sort_keys=True,
+        )
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
     async def ask(
         self,
         prompt: str,
@@ -101,98 +161,166 @@ class GrokClient:
         else:
             return await self._complete(messages, max_tokens)
     
-    async def _complete(
-        self,
-        messages: List[ChatCompletionMessageParam],
-        max_tokens: Optional[int] = None
-    ) -> GrokResponse:
-        """Get a non-streaming completion."""
+    @staticmethod
+    def _retry_after_seconds(error) -> Optional[float]:
+        """Extract the server-advised backoff from a rate-limit error.
+
+        Args:
+            error: openai.RateLimitError (or anything carrying a response)
+
+        Returns:
+            Seconds to wait, or None when no usable header is present
+        """
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if not headers:
+            return None
+        value = headers.get("Retry-After") or headers.get("x-ratelimit-reset-requests")
+        if value is None:
+            return None
+        try:
+            return float(value.rstrip("s").rstrip("m") if isinstance(value, str) else value)
+        except (TypeError, ValueError):
+            return None
+
+    async def _call_with_retry(self, make_request):
+        """Run a request factory with exponential backoff and jitter.
+
+        Args:
+            make_request: Zero-argument coroutine factory performing one
+                request attempt
+
+        Returns:
+            Whatever the factory returns on the first successful attempt
+        """
         for attempt in range(self.max_retries):
             try:
-                completion = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=self.temperature,
-                    max_tokens=max_tokens,
-                    stream=False
-                )
-                
-                content = completion.choices[0].message.content or ""
-                tokens = completion.usage.total_tokens if completion.usage else 0
-                self.total_tokens_used += tokens
-                
-                return GrokResponse(
-                    content=content,
-                    tokens_used=tokens,
-                    model=self.model,
-                    timestamp=time.time(),
-                    streaming=False
-                )
-                
+                return await make_request()
+
             except openai.RateLimitError as e:
-                wait_time = self.retry_delay * (2 ** attempt)
+                wait_time = self.retry_delay * (2 ** attempt) + random.uniform(0, 0.3)
+                # Prefer the server-dictated backoff when it is longer
+                retry_after = self._retry_after_seconds(e)
+                if retry_after is not None:
+                    wait_time = max(wait_time, retry_after)
                 logger.warning(f"Rate limit hit, waiting {wait_time}s: {e}")
                 await asyncio.sleep(wait_time)
-                
+
             except Exception as e:
                 if attempt == self.max_retries - 1:
                     logger.error(f"Failed after {self.max_retries} attempts: {e}")
                     raise
-                wait_time = self.retry_delay * (2 ** attempt)
+                wait_time = self.retry_delay * (2 ** attempt) + random.uniform(0, 0.3)
                 logger.warning(f"Attempt {attempt + 1} failed, retrying in {wait_time}s: {e}")
                 await asyncio.sleep(wait_time)
-                
+
         raise Exception(f"Failed to get completion after {self.max_retries} attempts")
-    
+
+    async def _complete(
+        self,
+        messages: List[ChatCompletionMessageParam],
+        max_tokens: Optional[int] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None
+    ) -> GrokResponse:
+        """Get a non-streaming completion.
+
+        Args:
+            messages: Messages to send
+            max_tokens: Maximum tokens in response
+            model: Optional model override (defaults to the client's model)
+            temperature: Optional temperature override
+        """
+        model = model or self.model
+        temperature = temperature if temperature is not None else self.temperature
+
+        # Only effectively deterministic requests are worth caching;
+        # creative temperatures bypass the cache entirely
+        cache_key = None
+        if temperature <= self._CACHE_TEMPERATURE_MAX:
+            cache_key = self._response_cache_key(model, temperature, messages, max_tokens)
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                self._response_cache.move_to_end(cache_key)
+                return replace(cached, timestamp=time.time())
+
+        async def make_request() -> GrokResponse:
+            completion = await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=False
+            )
+
+            content = completion.choices[0].message.content or ""
+            tokens = completion.usage.total_tokens if completion.usage else 0
+            self.total_tokens_used += tokens
+
+            return GrokResponse(
+                content=content,
+                tokens_used=tokens,
+                model=model,
+                timestamp=time.time(),
+                streaming=False
+            )
+
+        response = await self._call_with_retry(make_request)
+        if cache_key is not None:
+            self._response_cache[cache_key] = response
+            if len(self._response_cache) > self._RESPONSE_CACHE_MAX_ENTRIES:
+                self._response_cache.popitem(last=False)
+        return response
+
     async def _stream_completion(
         self,
         messages: List[ChatCompletionMessageParam],
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None
     ) -> GrokResponse:
-        """Get a streaming completion."""
-        content_parts = []
-        
-        for attempt in range(self.max_retries):
-            try:
-                stream = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=self.temperature,
-                    max_tokens=max_tokens,
-                    stream=True
-                )
-                
-                async for chunk in stream:
-                    if chunk.choices[0].delta.content:
-                        content_parts.append(chunk.choices[0].delta.content)
-                
-                content = "".join(content_parts)
-                # Estimate tokens for streaming (rough approximation)
-                tokens = len(content) // 4
-                self.total_tokens_used += tokens
-                
-                return GrokResponse(
-                    content=content,
-                    tokens_used=tokens,
-                    model=self.model,
-                    timestamp=time.time(),
-                    streaming=True
-                )
-                
-            except openai.RateLimitError as e:
-                wait_time = self.retry_delay * (2 ** attempt)
-                logger.warning(f"Rate limit hit, waiting {wait_time}s: {e}")
-                await asyncio.sleep(wait_time)
-                
-            except Exception as e:
-                if attempt == self.max_retries - 1:
-                    logger.error(f"Failed after {self.max_retries} attempts: {e}")
-                    raise
-                wait_time = self.retry_delay * (2 ** attempt)
-                logger.warning(f"Attempt {attempt + 1} failed, retrying in {wait_time}s: {e}")
-                await asyncio.sleep(wait_time)
-                
-        raise Exception(f"Failed to get streaming completion after {self.max_retries} attempts")
+        """Get a streaming completion.
+
+        Args:
+            messages: Messages to send
+            max_tokens: Maximum tokens in response
+            model: Optional model override (defaults to the client's model)
+            temperature: Optional temperature override
+        """
+        model = model or self.model
+        temperature = temperature if temperature is not None else self.temperature
+
+        async def make_request() -> GrokResponse:
+            # Fresh accumulator per attempt so a retried stream can't
+            # prepend partial content from a failed one
+            buf = io.StringIO()
+            stream = await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+
+            async for chunk in stream:
+                # Walrus avoids touching the delta attribute chain twice
+                if (delta := chunk.choices[0].delta.content):
+                    buf.write(delta)
+
+            content = buf.getvalue()
+            # Count tokens once over the joined content
+            tokens = self.estimate_tokens(content)
+            self.total_tokens_used += tokens
+
+            return GrokResponse(
+                content=content,
+                tokens_used=tokens,
+                model=model,
+                timestamp=time.time(),
+                streaming=True
+            )
+
+        return await self._call_with_retry(make_request)
     
     async def stream_ask(
         self,
@@ -216,32 +344,32 @@ class GrokClient:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
         
+        async def make_request():
+            return await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+
+        # Failures before the first chunk may retry with a fresh stream;
+        # once anything has been yielded a retry would duplicate output,
+        # so mid-stream errors are re-raised
         for attempt in range(self.max_retries):
+            stream = await self._call_with_retry(make_request)
+            started = False
             try:
-                stream = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=self.temperature,
-                    max_tokens=max_tokens,
-                    stream=True
-                )
-                
                 async for chunk in stream:
                     if chunk.choices[0].delta.content:
+                        started = True
                         yield chunk.choices[0].delta.content
                 return
-                
-            except openai.RateLimitError as e:
-                wait_time = self.retry_delay * (2 ** attempt)
-                logger.warning(f"Rate limit hit, waiting {wait_time}s: {e}")
-                await asyncio.sleep(wait_time)
-                
             except Exception as e:
-                if attempt == self.max_retries - 1:
-                    logger.error(f"Failed after {self.max_retries} attempts: {e}")
+                if started or attempt == self.max_retries - 1:
                     raise
-                wait_time = self.retry_delay * (2 ** attempt)
-                logger.warning(f"Attempt {attempt + 1} failed, retrying in {wait_time}s: {e}")
+                wait_time = self.retry_delay * (2 ** attempt) + random.uniform(0, 0.3)
+                logger.warning(f"Stream failed before first chunk, retrying in {wait_time}s: {e}")
                 await asyncio.sleep(wait_time)
     
     def estimate_tokens(self, text: str) -> int:
@@ -253,6 +381,9 @@ class GrokClient:
         Returns:
             Estimated token count
         """
+        encoder = _get_token_encoder()
+        if encoder is not None:
+            return len(encoder.encode(text))
         # Rough estimate: 1 token per 4 characters
         return len(text) // 4
     
@@ -292,23 +423,12 @@ class GrokClient:
                 "content": msg["content"]
             })
         
-        # Use provided parameters or defaults
-        actual_model = model or self.model
-        actual_temp = temperature if temperature is not None else self.temperature
-        
-        # Temporarily update instance values
-        old_model = self.model
-        old_temp = self.temperature
-        self.model = actual_model
-        self.temperature = actual_temp
-        
-        try:
-            if stream:
-                response = await self._stream_completion(formatted_messages, max_tokens)
-            else:
-                response = await self._complete(formatted_messages, max_tokens)
-            return response
-        finally:
-            # Restore original values
-            self.model = old_model
-            self.temperature = old_temp
\ No newline at end of file
+        # Overrides flow down as arguments; mutating instance state here
+        # would race with concurrent calls sharing this client
+        if stream:
+            return await self._stream_completion(
+                formatted_messages, max_tokens, model=model, temperature=temperature
+            )
+        return await self._complete(
+            formatted_messages, max_tokens, model=model, temperature=temperature
+        )
\ No newline at end of file
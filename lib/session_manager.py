@@ -3,12 +3,14 @@ Session Manager - State tracking with checkpointing and crash recovery.
 """
 
 import asyncio
+import re
 import uuid
 import time
 import os
 from typing import Optional, List, Dict, Any
+from collections import OrderedDict
 from datetime import datetime
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, fields
 import logging
 import json
 
@@ -17,14 +19,45 @@ from .grok_client import GrokResponse
 
 logger = logging.getLogger(__name__)
 
+# Response-quality features fused into one alternation so scoring walks
+# the response a single time instead of once per substring check
+_QS_PATTERNS = re.compile(
+    r"(?P<code>```)"
+    r"|(?P<header>^#{1,6}\s)"
+    r"|(?P<list>^[-*]\s|^\d+\.\s)",
+    re.MULTILINE
+)
+_QS_WEIGHTS = {"code": 0.3, "header": 0.2, "list": 0.15}
 
-@dataclass
+# Technical terms are probed as whole tokens against a frozenset rather
+# than scanned for as substrings
+_WORD_RE = re.compile(r"[a-z]+")
+_TECH_TERMS = frozenset({
+    "implement", "function", "class", "method", "algorithm",
+    "optimize", "architecture", "performance", "security"
+})
+
+# Timestamp strings are only precise to the second in practice, so one
+# formatted value is shared by every caller within a half-second window
+_now_cache = {"t": 0.0, "iso": ""}
+
+
+def _now_iso() -> str:
+    """Return the current time in ISO format, cached per half second."""
+    t = time.time()
+    if t - _now_cache["t"] > 0.5:
+        _now_cache["t"] = t
+        _now_cache["iso"] = datetime.fromtimestamp(t).isoformat()
+    return _now_cache["iso"]
+
+
+@dataclass(slots=True)
 class Session:
     """Represents a discussion session."""
     id: str
     topic: str
     status: str = "active"  # active, completed, failed, paused
-    created: str = field(default_factory=lambda: datetime.now().isoformat())
+    created: str = field(default_factory=_now_iso)
     max_iterations: int = 3
     iterations_completed: int = 0
     has_baseline: bool = False
@@ -36,15 +69,51 @@ class Session:
     checkpoints: List[Dict[str, Any]] = field(default_factory=list)
     last_checkpoint: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
-    
+    # Running aggregates kept in step with the lists above so stats reads
+    # are O(1); derived, so they are rebuilt on load and never persisted
+    responses_count: int = 0
+    checkpoints_count: int = 0
+    quality_sum: float = 0.0
+
+    def __post_init__(self):
+        self.responses_count = len(self.responses)
+        self.checkpoints_count = len(self.checkpoints)
+        self.quality_sum = sum(self.quality_scores)
+
     def to_dict(self) -> Dict[str, Any]:
-        """Convert session to dictionary."""
-        return asdict(self)
+        """Convert session to dictionary.
+
+        The returned dict shares list/dict references with the session
+        rather than deep-copying them the way asdict does; the only
+        consumer is JSON serialization, which never mutates them.
+        """
+        return {
+            "id": self.id,
+            "topic": self.topic,
+            "status": self.status,
+            "created": self.created,
+            "max_iterations": self.max_iterations,
+            "iterations_completed": self.iterations_completed,
+            "has_baseline": self.has_baseline,
+            "baseline_path": self.baseline_path,
+            "responses": self.responses,
+            "context_files": self.context_files,
+            "total_tokens": self.total_tokens,
+            "quality_scores": self.quality_scores,
+            "checkpoints": self.checkpoints,
+            "last_checkpoint": self.last_checkpoint,
+            "metadata": self.metadata
+        }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Session":
-        """Create session from dictionary."""
-        return cls(**data)
+        """Create session from dictionary.
+
+        Ignores keys that aren't Session fields, such as the saved_at
+        stamp the storage layer adds when persisting.
+        """
+        field_names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in field_names})
 
 
 class SessionManager:
@@ -57,13 +126,34 @@ class SessionManager:
             storage_manager: Storage manager instance
         """
         self.storage = storage_manager
-        self.active_sessions: Dict[str, Session] = {}
+        # SIEVE-style cache: one insertion-ordered dict plus a
+        # visited-bit set. Hits only flip a bit (no reordering), and
+        # eviction scans from the front - the globally oldest entry -
+        # giving recently-used sessions a second chance
+        self.active_sessions: OrderedDict[str, Session] = OrderedDict()
+        self._visited: set = set()
+        # Ids of in-memory sessions whose status is "active", maintained on
+        # every status change so polling paths avoid a full scan
+        self._active_status_ids: set = set()
         self.checkpoint_interval = 60  # seconds
-        self._checkpoint_tasks: Dict[str, asyncio.Task] = {}
+        self._checkpoint_loop_task = None  # Shared periodic checkpoint task
         self.max_active_sessions = int(os.getenv('MAX_ACTIVE_SESSIONS', '100'))  # Max sessions in memory
-        self.session_access_times: Dict[str, datetime] = {}  # Track last access for LRU
+        self.session_access_times: Dict[str, float] = {}  # Monotonic access times for inactivity cleanup
+        # Write-ahead log: events appended per session since its last
+        # snapshot; a snapshot compacts the log once this many accumulate
+        self._wal_counts: Dict[str, int] = {}
+        self._wal_snapshot_every = 20
+        # In-flight storage loads keyed by session id, so concurrent
+        # get_session calls for the same id share one read
+        self._loading: Dict[str, asyncio.Future] = {}
+        # Dirty-session ids drained by the debounced writer task
+        self._dirty: set = set()
+        self._flush_event = asyncio.Event()
+        self._flush_task = None
         self._cleanup_task = None  # Periodic cleanup task
         self._start_cleanup_task()  # Start periodic cleanup
+        self._start_checkpoint_loop()  # Start shared checkpoint loop
+        self._start_flush_task()  # Start debounced session writer
         
     def generate_session_id(self, prefix: str = "session") -> str:
         """Generate a unique session ID.
@@ -74,8 +164,10 @@ class SessionManager:
         Returns:
             Unique session identifier
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        unique_id = str(uuid.uuid4())[:8]
+        # time.strftime skips the datetime object, and taking hex of the
+        # raw UUID bytes skips formatting the full hyphenated string
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        unique_id = uuid.uuid4().bytes[:4].hex()
         return f"{prefix}_{timestamp}_{unique_id}"
     
     async def create_session(
@@ -111,14 +203,12 @@ class SessionManager:
         
         # Add to active sessions
         self.active_sessions[session_id] = session
-        self.session_access_times[session_id] = datetime.now()
-        
+        self.session_access_times[session_id] = time.monotonic()
+        self._track_status(session)
+
         # Save initial state
         await self._save_session(session)
-        
-        # Start checkpoint task
-        self._start_checkpoint_task(session_id)
-        
+
         logger.info(f"Created session {session_id} for topic: {topic}")
         return session
     
@@ -133,27 +223,39 @@ class SessionManager:
         """
         # Check active sessions first
         if session_id in self.active_sessions:
-            # Update access time for LRU
-            self.session_access_times[session_id] = datetime.now()
+            # SIEVE hit: mark visited instead of reordering the dict
+            self._visited.add(session_id)
+            self.session_access_times[session_id] = time.monotonic()
             return self.active_sessions[session_id]
         
-        # Try to load from storage
-        session_data = await self.storage.load_session(session_id)
-        if session_data:
-            # Check if we need to evict before loading
-            await self._check_and_evict_sessions()
-            
-            session = Session.from_dict(session_data)
-            self.active_sessions[session_id] = session
-            self.session_access_times[session_id] = datetime.now()
-            
-            # Restart checkpoint task if session is active
-            if session.status == "active":
-                self._start_checkpoint_task(session_id)
-            
+        # Join an in-flight load for the same id instead of re-reading
+        in_flight = self._loading.get(session_id)
+        if in_flight is not None:
+            return await in_flight
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[session_id] = future
+        try:
+            # Try to load from storage
+            session = None
+            session_data = await self.storage.load_session(session_id)
+            if session_data:
+                # Check if we need to evict before loading
+                await self._check_and_evict_sessions()
+
+                session = Session.from_dict(session_data)
+                await self._replay_session_log(session)
+                self.active_sessions[session_id] = session
+                self.session_access_times[session_id] = time.monotonic()
+                self._track_status(session)
+
+            future.set_result(session)
             return session
-        
-        return None
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self._loading[session_id]
     
     async def update_session(
         self,
@@ -178,34 +280,48 @@ class SessionManager:
             raise ValueError(f"Session {session_id} not found")
         
         # Update response if provided
+        response_entry = None
         if response:
-            session.responses.append({
+            response_entry = {
                 "iteration": session.iterations_completed,
                 "content": response.content,
                 "tokens": response.tokens_used,
                 "timestamp": response.timestamp
-            })
+            }
+            session.responses.append(response_entry)
+            session.responses_count += 1
             session.total_tokens += response.tokens_used
-        
+
         # Update iteration count
         if iteration_complete:
             session.iterations_completed += 1
-            
+
             # Check if max iterations reached
             if session.iterations_completed >= session.max_iterations:
                 session.status = "completed"
-        
+
         # Update status if provided
         if status:
             session.status = status
-        
-        # Save updated session
-        await self._save_session(session)
-        
-        # Stop checkpoint task if session is no longer active
+
+        self._track_status(session)
+
+        if response_entry is not None:
+            # Append only the delta instead of rewriting the whole session
+            await self._append_event(session, {
+                "type": "response",
+                "response": response_entry,
+                "iterations_completed": session.iterations_completed,
+                "total_tokens": session.total_tokens,
+                "status": session.status
+            })
+        else:
+            await self._save_session(session)
+
+        # Leaving the active state compacts the log into a snapshot
         if session.status != "active":
-            self._stop_checkpoint_task(session_id)
-        
+            await self._snapshot(session)
+
         return session
     
     async def add_checkpoint(self, session_id: str) -> Dict[str, Any]:
@@ -220,21 +336,34 @@ class SessionManager:
         session = await self.get_session(session_id)
         if not session:
             raise ValueError(f"Session {session_id} not found")
-        
+
+        # Skip the write entirely when nothing changed since the previous
+        # checkpoint; idle sessions otherwise rewrite identical JSON every
+        # interval
+        if session.checkpoints:
+            last = session.checkpoints[-1]
+            if (last.get("iteration") == session.iterations_completed
+                    and last.get("tokens_used") == session.total_tokens
+                    and last.get("responses_count") == session.responses_count
+                    and last.get("status") == session.status):
+                session.last_checkpoint = _now_iso()
+                return last
+
         checkpoint = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_iso(),
             "iteration": session.iterations_completed,
             "status": session.status,
             "tokens_used": session.total_tokens,
-            "responses_count": len(session.responses)
+            "responses_count": session.responses_count
         }
-        
+
         session.checkpoints.append(checkpoint)
+        session.checkpoints_count += 1
         session.last_checkpoint = checkpoint["timestamp"]
-        
-        # Save session with checkpoint
-        await self._save_session(session)
-        
+
+        # Log the checkpoint as a delta rather than rewriting the session
+        await self._append_event(session, {"type": "checkpoint", **checkpoint})
+
         logger.debug(f"Created checkpoint for session {session_id}")
         return checkpoint
     
@@ -255,7 +384,10 @@ class SessionManager:
                 return None
             
             session = Session.from_dict(session_data)
-            
+
+            # Replay any deltas logged after the last snapshot
+            await self._replay_session_log(session)
+
             # Check if recovery is needed
             if session.status == "active" and session.checkpoints:
                 last_checkpoint = session.checkpoints[-1]
@@ -267,15 +399,13 @@ class SessionManager:
                 
                 # Mark as recovered
                 session.metadata["recovered"] = True
-                session.metadata["recovery_time"] = datetime.now().isoformat()
+                session.metadata["recovery_time"] = _now_iso()
             
             # Add to active sessions
             self.active_sessions[session_id] = session
-            
-            # Restart checkpoint task if still active
-            if session.status == "active":
-                self._start_checkpoint_task(session_id)
-            
+            self.session_access_times[session_id] = time.monotonic()
+            self._track_status(session)
+
             return session
             
         except Exception as e:
@@ -299,15 +429,27 @@ class SessionManager:
             raise ValueError(f"Cannot pause session in {session.status} state")
         
         session.status = "paused"
-        session.metadata["paused_at"] = datetime.now().isoformat()
-        
-        # Create checkpoint before pausing
-        await self.add_checkpoint(session_id)
-        
-        # Save and stop checkpoint task
-        await self._save_session(session)
-        self._stop_checkpoint_task(session_id)
-        
+        session.metadata["paused_at"] = _now_iso()
+        self._track_status(session)
+
+        # Record the pre-pause checkpoint in memory only; the snapshot
+        # below persists it, so the transition costs one write instead of
+        # a log append plus a full save
+        checkpoint = {
+            "timestamp": _now_iso(),
+            "iteration": session.iterations_completed,
+            "status": session.status,
+            "tokens_used": session.total_tokens,
+            "responses_count": session.responses_count
+        }
+        session.checkpoints.append(checkpoint)
+        session.checkpoints_count += 1
+        session.last_checkpoint = checkpoint["timestamp"]
+
+        # Snapshot immediately (also compacts the log); the shared
+        # checkpoint loop skips non-active sessions from here on
+        await self._snapshot(session)
+
         logger.info(f"Paused session {session_id}")
         return session
     
@@ -328,12 +470,12 @@ class SessionManager:
             raise ValueError(f"Cannot resume session in {session.status} state")
         
         session.status = "active"
-        session.metadata["resumed_at"] = datetime.now().isoformat()
-        
-        # Save and restart checkpoint task
+        session.metadata["resumed_at"] = _now_iso()
+        self._track_status(session)
+
+        # Save; the shared checkpoint loop picks the session up again
         await self._save_session(session)
-        self._start_checkpoint_task(session_id)
-        
+
         logger.info(f"Resumed session {session_id}")
         return session
     
@@ -348,104 +490,216 @@ class SessionManager:
         """
         score = 0.0
         factors = 0
-        
+
         # Length factor (longer responses often more detailed)
         if len(response) > 100:
             score += 0.2
             factors += 1
-        
-        # Code presence (indicates actionable content)
-        if "```" in response:
-            score += 0.3
-            factors += 1
-        
-        # Structure (headers indicate organization)
-        if "#" in response or "##" in response:
-            score += 0.2
-            factors += 1
-        
-        # Lists (indicate structured information)
-        if "- " in response or "* " in response or "1. " in response:
-            score += 0.15
+
+        # Code blocks, headers and lists are detected in one pass over the
+        # response; each named group scores at most once
+        for group in {match.lastgroup for match in _QS_PATTERNS.finditer(response)}:
+            score += _QS_WEIGHTS[group]
             factors += 1
-        
-        # Specificity (technical terms)
-        technical_terms = ["implement", "function", "class", "method", "algorithm", 
-                          "optimize", "architecture", "performance", "security"]
-        if any(term in response.lower() for term in technical_terms):
+
+        # Specificity: tokenize once and hash-probe the term set instead
+        # of running one substring scan per term
+        if _TECH_TERMS.intersection(_WORD_RE.findall(response.lower())):
             score += 0.15
             factors += 1
-        
+
         # Normalize score
         if factors > 0:
             return min(1.0, score)
-        
+
         # Default score for minimal responses
         return 0.3
     
+    def _track_status(self, session: Session):
+        """Keep the active-status index in step with a session's status.
+
+        Args:
+            session: Session whose status may have changed
+        """
+        if session.status == "active":
+            self._active_status_ids.add(session.id)
+        else:
+            self._active_status_ids.discard(session.id)
+
     async def _save_session(self, session: Session):
-        """Save session to storage.
-        
+        """Queue a session for the debounced writer.
+
+        Bursts of mutations (several updates landing back-to-back) collapse
+        into a single storage write when the writer drains the dirty set.
+
         Args:
             session: Session to save
         """
-        await self.storage.save_session(session.id, session.to_dict())
-    
-    def _start_checkpoint_task(self, session_id: str):
-        """Start periodic checkpoint task for a session.
-        
+        self._dirty.add(session.id)
+        self._flush_event.set()
+
+    async def _append_event(self, session: Session, event: Dict[str, Any]):
+        """Append a delta to the session's write-ahead log.
+
+        Snapshots the session once enough events accumulate, so total
+        bytes written stay O(deltas) instead of O(session size) per update.
+
         Args:
-            session_id: Session identifier
+            session: Session the event belongs to
+            event: Event data to log
         """
-        if session_id in self._checkpoint_tasks:
-            return  # Task already running
-        
-        async def checkpoint_loop():
-            """Periodic checkpoint loop."""
-            while session_id in self.active_sessions:
-                await asyncio.sleep(self.checkpoint_interval)
-                
-                if session_id in self.active_sessions:
-                    session = self.active_sessions[session_id]
-                    if session.status == "active":
-                        await self.add_checkpoint(session_id)
-        
-        task = asyncio.create_task(checkpoint_loop())
-        self._checkpoint_tasks[session_id] = task
-    
-    def _stop_checkpoint_task(self, session_id: str):
-        """Stop checkpoint task for a session.
-        
+        await self.storage.append_session_event(session.id, event)
+        count = self._wal_counts.get(session.id, 0) + 1
+        if count >= self._wal_snapshot_every:
+            await self._snapshot(session)
+        else:
+            self._wal_counts[session.id] = count
+
+    async def _snapshot(self, session: Session):
+        """Write a full session snapshot and truncate its log.
+
         Args:
-            session_id: Session identifier
+            session: Session to snapshot
+        """
+        await self._flush_now(session)
+
+    async def _replay_session_log(self, session: Session):
+        """Replay logged deltas on top of a loaded snapshot.
+
+        Args:
+            session: Session freshly loaded from its snapshot
+        """
+        events = await self.storage.load_session_events(session.id)
+        for event in events:
+            event_type = event.get("type")
+            if event_type == "response":
+                session.responses.append(event["response"])
+                session.responses_count += 1
+                session.iterations_completed = event.get(
+                    "iterations_completed", session.iterations_completed)
+                session.total_tokens = event.get("total_tokens", session.total_tokens)
+                session.status = event.get("status", session.status)
+            elif event_type == "checkpoint":
+                checkpoint = {k: v for k, v in event.items() if k != "type"}
+                session.checkpoints.append(checkpoint)
+                session.checkpoints_count += 1
+                session.last_checkpoint = checkpoint.get("timestamp")
+        self._wal_counts[session.id] = len(events)
+        if events:
+            logger.info(f"Replayed {len(events)} logged events for session {session.id}")
+
+    async def _flush_now(self, session: Session):
+        """Write a session to storage immediately.
+
+        Used where durability matters right away: pausing and removal from
+        memory, where waiting on the debounce window would risk data loss.
+
+        Args:
+            session: Session to save
         """
-        if session_id in self._checkpoint_tasks:
-            task = self._checkpoint_tasks[session_id]
-            task.cancel()
-            del self._checkpoint_tasks[session_id]
+        self._dirty.discard(session.id)
+        await self.storage.save_session(session.id, session.to_dict())
+        # A full write supersedes any logged deltas; truncate the log so
+        # the next load doesn't replay events already in the snapshot
+        self.storage.clear_session_events(session.id)
+        self._wal_counts.pop(session.id, None)
+
+    def _start_flush_task(self):
+        """Start the debounced writer that drains dirty sessions."""
+        async def flush_loop():
+            """Coalesce save requests into batched storage writes."""
+            while True:
+                try:
+                    await self._flush_event.wait()
+                    # Let a burst of mutations accumulate before writing
+                    await asyncio.sleep(0.05)
+                    dirty_ids = self._dirty
+                    self._dirty = set()
+                    self._flush_event.clear()
+                    # _flush_now rather than a bare save so the written
+                    # snapshot also truncates each session's log
+                    await asyncio.gather(*(
+                        self._flush_now(self.active_sessions[sid])
+                        for sid in dirty_ids if sid in self.active_sessions
+                    ))
+                except asyncio.CancelledError:
+                    break
+                except Exception as e:
+                    logger.error(f"Error in session flush loop: {e}")
+
+        self._flush_task = asyncio.create_task(flush_loop())
+
+    def stop_flush_task(self):
+        """Stop the debounced session writer."""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+    
+    def _start_checkpoint_loop(self):
+        """Start the single shared periodic checkpoint task.
+
+        One timer serves every session: each tick it checkpoints all
+        currently-active sessions together, instead of running one
+        sleeping coroutine per session.
+        """
+        async def checkpoint_loop():
+            """Periodic checkpoint loop shared by all sessions."""
+            while True:
+                try:
+                    await asyncio.sleep(self.checkpoint_interval)
+
+                    active_ids = [
+                        session_id for session_id in self._active_status_ids
+                        if session_id in self.active_sessions
+                    ]
+                    if active_ids:
+                        await asyncio.gather(
+                            *(self.add_checkpoint(session_id) for session_id in active_ids)
+                        )
+
+                except asyncio.CancelledError:
+                    break
+                except Exception as e:
+                    logger.error(f"Error in checkpoint loop: {e}")
+
+        self._checkpoint_loop_task = asyncio.create_task(checkpoint_loop())
+
+    def stop_checkpoint_loop(self):
+        """Stop the shared checkpoint task."""
+        if self._checkpoint_loop_task and not self._checkpoint_loop_task.done():
+            self._checkpoint_loop_task.cancel()
     
     async def _check_and_evict_sessions(self):
-        """Check if eviction is needed and evict LRU sessions."""
-        if len(self.active_sessions) >= self.max_active_sessions:
-            # Find the least recently used session
-            if self.session_access_times:
-                lru_session_id = min(
-                    self.session_access_times.keys(),
-                    key=lambda k: self.session_access_times[k]
-                )
-                
-                # Save before evicting
-                if lru_session_id in self.active_sessions:
-                    await self._save_session(self.active_sessions[lru_session_id])
-                    
-                    # Stop checkpoint task
-                    self._stop_checkpoint_task(lru_session_id)
-                    
-                    # Remove from memory
-                    del self.active_sessions[lru_session_id]
-                    del self.session_access_times[lru_session_id]
-                    
-                    logger.info(f"Evicted LRU session {lru_session_id} to free memory")
+        """Check if eviction is needed and evict a batch via SIEVE."""
+        if len(self.active_sessions) < self.max_active_sessions:
+            return
+
+        # Evict down to 90% of the cap in one go, so a burst of creations
+        # doesn't re-trigger eviction on every single insert at the limit
+        target = int(self.max_active_sessions * 0.9)
+        evicted = []
+
+        # Scan from the front of the insertion-ordered dict: sessions that
+        # were read since their last scan get their visited bit cleared and
+        # move to the back; unvisited ones are evicted. The scan terminates
+        # because each session can survive at most one pass
+        while len(self.active_sessions) > target:
+            session_id, session = self.active_sessions.popitem(last=False)
+
+            if session_id in self._visited:
+                # Second chance: clear the bit and requeue at the back
+                self._visited.discard(session_id)
+                self.active_sessions[session_id] = session
+                continue
+
+            self.session_access_times.pop(session_id, None)
+            self._active_status_ids.discard(session_id)
+            evicted.append(session)
+            logger.info(f"Evicted session {session_id} to free memory")
+
+        if evicted:
+            # Flush the whole batch concurrently; the debounced writer only
+            # covers sessions still held in memory
+            await asyncio.gather(*(self._flush_now(session) for session in evicted))
     
     async def cleanup_inactive_sessions(self, timeout_hours: int = None):
         """Clean up inactive sessions.
@@ -453,27 +707,27 @@ class SessionManager:
         Args:
             timeout_hours: Hours of inactivity before cleanup
         """
-        from datetime import timedelta
-        
         if timeout_hours is None:
             timeout_hours = float(os.getenv('SESSION_INACTIVITY_TIMEOUT_HOURS', '2'))
-        
-        cutoff_time = datetime.now() - timedelta(hours=timeout_hours)
+
+        cutoff_time = time.monotonic() - timeout_hours * 3600.0
         sessions_to_remove = []
-        
+
+        # Dict order is no longer access order under SIEVE, so the sweep
+        # checks every session; it only runs on the periodic cleanup tick
         for session_id, session in self.active_sessions.items():
-            # Check last access time
-            if session_id in self.session_access_times:
-                last_access = self.session_access_times[session_id]
-                if last_access < cutoff_time and session.status != "active":
-                    sessions_to_remove.append(session_id)
+            last_access = self.session_access_times.get(session_id)
+            if last_access is not None and last_access < cutoff_time \
+                    and session.status != "active":
+                sessions_to_remove.append(session_id)
         
         # Remove inactive sessions
         for session_id in sessions_to_remove:
             # Save before removing
-            await self._save_session(self.active_sessions[session_id])
-            self._stop_checkpoint_task(session_id)
+            await self._flush_now(self.active_sessions[session_id])
             del self.active_sessions[session_id]
+            self._visited.discard(session_id)
+            self._active_status_ids.discard(session_id)
             if session_id in self.session_access_times:
                 del self.session_access_times[session_id]
             logger.info(f"Cleaned up inactive session {session_id}")
@@ -484,7 +738,10 @@ class SessionManager:
         Returns:
             List of active sessions
         """
-        return [s for s in self.active_sessions.values() if s.status == "active"]
+        # O(active) via the maintained index instead of a full scan
+        return [self.active_sessions[session_id]
+                for session_id in self._active_status_ids
+                if session_id in self.active_sessions]
     
     def get_session_stats(self, session_id: str) -> Dict[str, Any]:
         """Get statistics for a session.
@@ -499,7 +756,7 @@ class SessionManager:
         if not session:
             return {}
         
-        avg_quality = sum(session.quality_scores) / len(session.quality_scores) if session.quality_scores else 0
+        avg_quality = session.quality_sum / len(session.quality_scores) if session.quality_scores else 0
         
         return {
             "id": session.id,
@@ -508,8 +765,8 @@ class SessionManager:
             "created": session.created,
             "iterations": f"{session.iterations_completed}/{session.max_iterations}",
             "total_tokens": session.total_tokens,
-            "responses": len(session.responses),
-            "checkpoints": len(session.checkpoints),
+            "responses": session.responses_count,
+            "checkpoints": session.checkpoints_count,
             "average_quality": round(avg_quality, 2),
             "has_baseline": session.has_baseline
         }
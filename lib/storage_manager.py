@@ -4,19 +4,58 @@ Storage Manager - Local persistence for sessions, responses, and baselines.
 
 import json
 import os
+import re
 import asyncio
-import aiofiles
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 import logging
 import hashlib
 
+# Optional fast JSON encoder; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Tokens worth indexing for response search
+_TOKEN_RE = re.compile(r"[a-z0-9_]{3,}")
+
+
+def _sync_write(path: Path, data) -> None:
+    """Write a small file in one blocking call (run via to_thread)."""
+    if isinstance(data, bytes):
+        path.write_bytes(data)
+    else:
+        path.write_text(data)
+
+
+def _sync_append(path: Path, data: str) -> None:
+    """Append to a file in one blocking call (run via to_thread)."""
+    with open(path, 'a') as f:
+        f.write(data)
+
+
+def _sync_write_atomic(path: Path, data) -> None:
+    """Write a file via a temp name and rename (run via to_thread).
+
+    os.replace is atomic on the same filesystem, so readers never see a
+    half-written file after a crash. No fsync: this path is used for
+    metadata that can be rebuilt from the session files.
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    _sync_write(tmp_path, data)
+    os.replace(tmp_path, path)
+
 
 class StorageManager:
     """Manages local storage for Grok discussions."""
+
+    # Cached search results kept per (query, session, index version)
+    _SEARCH_CACHE_MAX_ENTRIES = 128
     
     def __init__(self, storage_path: str = "./grok_discussions"):
         """Initialize storage manager.
@@ -35,7 +74,19 @@ class StorageManager:
         
         # Load or initialize metadata
         self.metadata = self._load_metadata()
-        
+
+        # Debounced metadata persistence: writers mark the metadata dirty
+        # and a single background task coalesces the rewrites
+        self._metadata_dirty = asyncio.Event()
+        self._metadata_flush_delay = 0.2
+        self._flusher_task: Optional[asyncio.Task] = None
+        self._closing = False
+
+        # Search cache, invalidated by bumping the index version on
+        # every response write
+        self._search_cache: OrderedDict = OrderedDict()
+        self._index_version = 0
+
     def _ensure_directories(self):
         """Ensure all storage directories exist."""
         for path in [self.sessions_path, self.responses_path, self.baselines_path]:
@@ -63,11 +114,45 @@ class StorageManager:
     async def save_metadata(self):
         """Save metadata to file."""
         try:
-            async with aiofiles.open(self.metadata_file, 'w') as f:
-                await f.write(json.dumps(self.metadata, indent=2))
+            await asyncio.to_thread(
+                _sync_write_atomic, self.metadata_file, json.dumps(self.metadata, indent=2)
+            )
         except Exception as e:
             logger.error(f"Failed to save metadata: {e}")
-    
+
+    def _mark_metadata_dirty(self):
+        """Flag the in-memory metadata as needing a flush.
+
+        Starts the background flusher on first use so the manager can
+        still be constructed outside a running event loop.
+        """
+        self._metadata_dirty.set()
+        if self._flusher_task is None or self._flusher_task.done():
+            self._flusher_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        """Coalesce metadata rewrites triggered in quick succession."""
+        while not self._closing:
+            await self._metadata_dirty.wait()
+            # Let a burst of writers finish before rewriting the file once
+            await asyncio.sleep(self._metadata_flush_delay)
+            self._metadata_dirty.clear()
+            await self.save_metadata()
+
+    async def aclose(self):
+        """Stop the flusher and persist any pending metadata changes."""
+        self._closing = True
+        if self._flusher_task is not None:
+            self._flusher_task.cancel()
+            try:
+                await self._flusher_task
+            except asyncio.CancelledError:
+                pass
+            self._flusher_task = None
+        if self._metadata_dirty.is_set():
+            self._metadata_dirty.clear()
+            await self.save_metadata()
+
     async def save_session(self, session_id: str, session_data: Dict[str, Any]) -> str:
         """Save a session to storage.
         
@@ -84,18 +169,30 @@ class StorageManager:
             # Add timestamp if not present
             if "saved_at" not in session_data:
                 session_data["saved_at"] = datetime.now().isoformat()
-            
-            async with aiofiles.open(file_path, 'w') as f:
-                await f.write(json.dumps(session_data, indent=2))
+
+            # orjson encodes straight to bytes several times faster than
+            # the stdlib encoder; sessions with many responses feel it
+            if orjson is not None:
+                payload = orjson.dumps(session_data, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(session_data, indent=2)
+            # One threadpool hop per file beats aiofiles' per-call dispatch
+            # for files this small
+            await asyncio.to_thread(_sync_write, file_path, payload)
             
             # Update metadata
             self.metadata["sessions"][session_id] = {
                 "path": str(file_path),
                 "saved_at": session_data["saved_at"],
-                "topic": session_data.get("topic", "Unknown")
+                "topic": session_data.get("topic", "Unknown"),
+                # Cached so list_sessions can filter and sort without
+                # reopening every session file
+                "status": session_data.get("status", "unknown"),
+                "created": session_data.get("created"),
+                "iterations_completed": session_data.get("iterations_completed", 0)
             }
             self.metadata["total_sessions"] += 1
-            await self.save_metadata()
+            self._mark_metadata_dirty()
             
             logger.info(f"Saved session {session_id} to {file_path}")
             return str(file_path)
@@ -127,13 +224,105 @@ class StorageManager:
             return None
         
         try:
-            async with aiofiles.open(file_path, 'r') as f:
-                content = await f.read()
-                return json.loads(content)
+            content = await asyncio.to_thread(file_path.read_text)
+            return json.loads(content)
         except Exception as e:
             logger.error(f"Failed to load session {session_id}: {e}")
             return None
     
+    async def append_session_event(self, session_id: str, event: Dict[str, Any]):
+        """Append one event to a session's write-ahead log.
+
+        Args:
+            session_id: Associated session ID
+            event: Event data to append as one JSON line
+        """
+        file_path = self.sessions_path / f"{session_id}.log"
+
+        try:
+            await asyncio.to_thread(_sync_append, file_path, json.dumps(event) + "\n")
+        except Exception as e:
+            logger.error(f"Failed to append event for session {session_id}: {e}")
+            raise
+
+    async def load_session_events(self, session_id: str) -> List[Dict[str, Any]]:
+        """Load the write-ahead log events for a session.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            List of logged events, oldest first (empty if no log exists)
+        """
+        file_path = self.sessions_path / f"{session_id}.log"
+
+        if not file_path.exists():
+            return []
+
+        events = []
+        try:
+            content = await asyncio.to_thread(file_path.read_text)
+            for line in content.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-append is expected;
+                    # everything before it is still valid
+                    logger.warning(f"Skipping corrupt log line for session {session_id}")
+        except Exception as e:
+            logger.error(f"Failed to load events for session {session_id}: {e}")
+
+        return events
+
+    def clear_session_events(self, session_id: str):
+        """Remove a session's write-ahead log after a snapshot.
+
+        Args:
+            session_id: Session identifier
+        """
+        file_path = self.sessions_path / f"{session_id}.log"
+        try:
+            file_path.unlink(missing_ok=True)
+        except Exception as e:
+            logger.error(f"Failed to clear log for session {session_id}: {e}")
+
+    @staticmethod
+    def _build_response_document(
+        session_id: str,
+        response: str,
+        iteration: int,
+        metadata: Optional[Dict[str, Any]]
+    ) -> str:
+        """Assemble the markdown document for a stored response.
+
+        Builds a parts list joined once at the end; repeated += on a
+        string reallocates the whole document per line.
+
+        Args:
+            session_id: Associated session ID
+            response: Response content
+            iteration: Iteration number in discussion
+            metadata: Additional metadata
+
+        Returns:
+            Complete markdown document
+        """
+        parts = [
+            "# Grok Response\n\n",
+            f"**Session**: {session_id}\n",
+            f"**Iteration**: {iteration}\n",
+            f"**Timestamp**: {datetime.now().isoformat()}\n",
+        ]
+
+        if metadata:
+            parts.append("\n## Metadata\n")
+            parts.extend(f"- **{key}**: {value}\n" for key, value in metadata.items())
+
+        parts.append(f"\n## Response\n\n{response}")
+        return "".join(parts)
+
     async def save_response(
         self,
         session_id: str,
@@ -158,37 +347,30 @@ class StorageManager:
         
         try:
             # Prepare response document
-            document = f"# Grok Response\n\n"
-            document += f"**Session**: {session_id}\n"
-            document += f"**Iteration**: {iteration}\n"
-            document += f"**Timestamp**: {datetime.now().isoformat()}\n"
-            
-            if metadata:
-                document += f"\n## Metadata\n"
-                for key, value in metadata.items():
-                    document += f"- **{key}**: {value}\n"
-            
-            document += f"\n## Response\n\n{response}"
-            
-            async with aiofiles.open(file_path, 'w') as f:
-                await f.write(document)
-            
+            document = self._build_response_document(
+                session_id, response, iteration, metadata
+            )
+
+            await asyncio.to_thread(_sync_write, file_path, document)
+
             # Update metadata
             self.metadata["total_responses"] += 1
-            
+
             # Add to search index
-            response_hash = hashlib.md5(response.encode()).hexdigest()[:8]
+            response_hash = hashlib.blake2b(response.encode(), digest_size=4).hexdigest()
             if "responses" not in self.metadata["index"]:
                 self.metadata["index"]["responses"] = {}
-            
+
             self.metadata["index"]["responses"][response_hash] = {
                 "session_id": session_id,
                 "iteration": iteration,
                 "path": str(file_path),
                 "timestamp": timestamp
             }
-            
-            await self.save_metadata()
+            self._index_response_tokens(document, response_hash)
+            self._index_version += 1
+
+            self._mark_metadata_dirty()
             
             logger.info(f"Saved response for session {session_id} to {file_path}")
             return str(file_path)
@@ -196,7 +378,77 @@ class StorageManager:
         except Exception as e:
             logger.error(f"Failed to save response: {e}")
             raise
-    
+
+    async def save_responses_batch(self, items: List[Dict[str, Any]]) -> List[str]:
+        """Save several Grok responses with one metadata update.
+
+        Writes the markdown files concurrently (bounded to keep file
+        descriptor usage sane) and rewrites the index once instead of
+        once per response.
+
+        Args:
+            items: Dicts with keys session_id, response, and optionally
+                iteration and metadata (same meaning as save_response)
+
+        Returns:
+            Paths to the saved response files, in input order
+        """
+        if not items:
+            return []
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        semaphore = asyncio.Semaphore(128)
+
+        async def write_one(file_path: Path, document: str):
+            async with semaphore:
+                await asyncio.to_thread(_sync_write, file_path, document)
+
+        writes = []
+        index_entries = {}
+        paths = []
+
+        try:
+            for position, item in enumerate(items):
+                session_id = item["session_id"]
+                response = item["response"]
+                iteration = item.get("iteration", 0)
+                metadata = item.get("metadata")
+
+                filename = f"response_{session_id}_{iteration}_{timestamp}_{position}.md"
+                file_path = self.responses_path / filename
+
+                document = self._build_response_document(
+                    session_id, response, iteration, metadata
+                )
+
+                response_hash = hashlib.blake2b(response.encode(), digest_size=4).hexdigest()
+                index_entries[response_hash] = {
+                    "session_id": session_id,
+                    "iteration": iteration,
+                    "path": str(file_path),
+                    "timestamp": timestamp
+                }
+                self._index_response_tokens(document, response_hash)
+                writes.append(write_one(file_path, document))
+                paths.append(str(file_path))
+
+            await asyncio.gather(*writes)
+
+            # Single metadata update for the whole batch
+            self.metadata["total_responses"] += len(items)
+            if "responses" not in self.metadata["index"]:
+                self.metadata["index"]["responses"] = {}
+            self.metadata["index"]["responses"].update(index_entries)
+            self._index_version += 1
+            self._mark_metadata_dirty()
+
+            logger.info(f"Saved batch of {len(items)} responses")
+            return paths
+
+        except Exception as e:
+            logger.error(f"Failed to save response batch: {e}")
+            raise
+
     async def save_baseline(
         self,
         session_id: str,
@@ -219,14 +471,15 @@ class StorageManager:
         
         try:
             # Prepare baseline document
-            document = f"# Baseline Document\n\n"
-            document += f"**Topic**: {topic}\n"
-            document += f"**Session**: {session_id}\n"
-            document += f"**Generated**: {datetime.now().isoformat()}\n"
-            document += f"\n---\n\n{baseline}"
+            document = (
+                f"# Baseline Document\n\n"
+                f"**Topic**: {topic}\n"
+                f"**Session**: {session_id}\n"
+                f"**Generated**: {datetime.now().isoformat()}\n"
+                f"\n---\n\n{baseline}"
+            )
             
-            async with aiofiles.open(file_path, 'w') as f:
-                await f.write(document)
+            await asyncio.to_thread(_sync_write, file_path, document)
             
             # Add to index
             if "baselines" not in self.metadata["index"]:
@@ -238,7 +491,7 @@ class StorageManager:
                 "timestamp": timestamp
             }
             
-            await self.save_metadata()
+            self._mark_metadata_dirty()
             
             logger.info(f"Saved baseline for session {session_id} to {file_path}")
             return str(file_path)
@@ -262,26 +515,34 @@ class StorageManager:
             List of session metadata
         """
         sessions = []
-        
+
         for session_id, info in self.metadata.get("sessions", {}).items():
-            # Load session to check status
-            session_data = await self.load_session(session_id)
-            if session_data:
-                if status and session_data.get("status") != status:
+            # Entries written before status was cached need one lazy
+            # load to backfill the metadata
+            if "status" not in info:
+                session_data = await self.load_session(session_id)
+                if not session_data:
                     continue
-                    
-                sessions.append({
-                    "id": session_id,
-                    "topic": info.get("topic", "Unknown"),
-                    "status": session_data.get("status", "unknown"),
-                    "created": session_data.get("created"),
-                    "iterations": session_data.get("iterations_completed", 0),
-                    "path": info.get("path")
-                })
-        
+                info["status"] = session_data.get("status", "unknown")
+                info["created"] = session_data.get("created")
+                info["iterations_completed"] = session_data.get("iterations_completed", 0)
+                self._mark_metadata_dirty()
+
+            if status and info["status"] != status:
+                continue
+
+            sessions.append({
+                "id": session_id,
+                "topic": info.get("topic", "Unknown"),
+                "status": info["status"],
+                "created": info.get("created"),
+                "iterations": info.get("iterations_completed", 0),
+                "path": info.get("path")
+            })
+
         # Sort by creation time (newest first)
-        sessions.sort(key=lambda x: x.get("created", ""), reverse=True)
-        
+        sessions.sort(key=lambda x: x.get("created") or "", reverse=True)
+
         return sessions[:limit]
     
     async def search_responses(
@@ -298,15 +559,30 @@ class StorageManager:
         Returns:
             List of matching responses with metadata
         """
-        results = []
         query_lower = query.lower()
-        
-        # Search through response files
-        for response_file in self.responses_path.glob("*.md"):
+
+        # Stale keys age out naturally: the index version changes on
+        # every response write, so old entries stop being hit
+        cache_key = (query_lower, session_id, self._index_version)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            self._search_cache.move_to_end(cache_key)
+            return list(cached)
+
+        results = []
+
+        # Search only files whose documents contain every query token,
+        # per the inverted index; a full directory scan is the fallback
+        # for queries the index cannot answer
+        await self._backfill_token_index()
+        candidate_files = self._index_candidates(query_lower)
+        if candidate_files is None:
+            candidate_files = self.responses_path.glob("*.md")
+
+        for response_file in candidate_files:
             try:
-                async with aiofiles.open(response_file, 'r') as f:
-                    content = await f.read()
-                    
+                content = await asyncio.to_thread(response_file.read_text)
+
                 if query_lower in content.lower():
                     # Extract session ID from filename
                     parts = response_file.stem.split("_")
@@ -324,9 +600,89 @@ class StorageManager:
                         
             except Exception as e:
                 logger.error(f"Error searching file {response_file}: {e}")
-        
-        return results
+
+        self._search_cache[cache_key] = results
+        if len(self._search_cache) > self._SEARCH_CACHE_MAX_ENTRIES:
+            self._search_cache.popitem(last=False)
+
+        return list(results)
     
+    def _index_response_tokens(self, document: str, response_hash: str):
+        """Record a response document's tokens in the inverted search index.
+
+        Indexes the whole stored document, not just the response body,
+        because search matches against full file content.
+
+        Args:
+            document: Stored document content to tokenize
+            response_hash: Hash identifying the response in the index
+        """
+        tokens_index = self.metadata["index"].setdefault("tokens", {})
+        for token in set(_TOKEN_RE.findall(document.lower())):
+            postings = tokens_index.setdefault(token, [])
+            if response_hash not in postings:
+                postings.append(response_hash)
+        self.metadata["index"].setdefault("indexed_responses", {})[response_hash] = True
+
+    async def _backfill_token_index(self):
+        """Index response files saved before token postings existed.
+
+        Without this, a query whose tokens all appear in some newer
+        response would skip the full-scan fallback and silently drop
+        matching pre-index files.
+        """
+        responses_index = self.metadata.get("index", {}).get("responses", {})
+        indexed = self.metadata["index"].setdefault("indexed_responses", {})
+        missing = [h for h in responses_index if h not in indexed]
+        if not missing:
+            return
+
+        for response_hash in missing:
+            file_path = Path(responses_index[response_hash]["path"])
+            try:
+                content = await asyncio.to_thread(file_path.read_text)
+                self._index_response_tokens(content, response_hash)
+            except Exception as e:
+                # Mark it handled either way; a file that can't be read
+                # can't be found by the full scan either
+                indexed[response_hash] = True
+                logger.error(f"Failed to backfill index for {file_path}: {e}")
+
+        logger.info(f"Backfilled token index for {len(missing)} responses")
+        self._mark_metadata_dirty()
+
+    def _index_candidates(self, query_lower: str) -> Optional[List[Path]]:
+        """Resolve a query to candidate response files via the token index.
+
+        Args:
+            query_lower: Lowercased search query
+
+        Returns:
+            Candidate file paths, or None if the index cannot answer
+            (empty index, no indexable tokens, or an unindexed token —
+            which may just mean the responses predate the index)
+        """
+        tokens_index = self.metadata.get("index", {}).get("tokens", {})
+        query_tokens = _TOKEN_RE.findall(query_lower)
+
+        if not tokens_index or not query_tokens:
+            return None
+        if any(token not in tokens_index for token in query_tokens):
+            return None
+
+        # Intersect posting lists, smallest first
+        query_tokens.sort(key=lambda token: len(tokens_index[token]))
+        hashes = set(tokens_index[query_tokens[0]])
+        for token in query_tokens[1:]:
+            hashes.intersection_update(tokens_index[token])
+
+        responses_index = self.metadata["index"].get("responses", {})
+        return [
+            Path(responses_index[response_hash]["path"])
+            for response_hash in hashes
+            if response_hash in responses_index
+        ]
+
     def _extract_snippet(self, content: str, query: str, context_chars: int = 100) -> str:
         """Extract a snippet around the query match.
         
@@ -365,42 +721,68 @@ class StorageManager:
         
         cutoff_date = datetime.now() - timedelta(days=days)
         removed_count = 0
-        
+        victims: List[Path] = []
+
         for session_id, info in list(self.metadata.get("sessions", {}).items()):
             try:
                 saved_at = datetime.fromisoformat(info.get("saved_at", ""))
                 if saved_at < cutoff_date:
-                    # Remove session file
+                    # Collect the file; deletions run together below
                     session_file = Path(info.get("path", ""))
                     if session_file.exists():
-                        session_file.unlink()
-                    
+                        victims.append(session_file)
+
                     # Remove from metadata
                     del self.metadata["sessions"][session_id]
                     removed_count += 1
-                    
+
             except Exception as e:
                 logger.error(f"Error cleaning up session {session_id}: {e}")
-        
+
+        if victims:
+            semaphore = asyncio.Semaphore(128)
+
+            async def unlink_one(path: Path):
+                async with semaphore:
+                    await asyncio.to_thread(path.unlink)
+
+            await asyncio.gather(
+                *[unlink_one(path) for path in victims],
+                return_exceptions=True
+            )
+
         if removed_count > 0:
-            await self.save_metadata()
+            self._mark_metadata_dirty()
             logger.info(f"Cleaned up {removed_count} old sessions")
-    
-    def get_storage_stats(self) -> Dict[str, Any]:
+
+    async def get_storage_stats(self) -> Dict[str, Any]:
         """Get storage statistics.
-        
+
         Returns:
             Dictionary with storage stats
         """
-        total_size = 0
-        file_count = 0
-        
-        for path in [self.sessions_path, self.responses_path, self.baselines_path]:
-            for file_path in path.glob("*"):
-                if file_path.is_file():
-                    total_size += file_path.stat().st_size
-                    file_count += 1
-        
+
+        def scan_dir(path: Path):
+            size = 0
+            count = 0
+            # DirEntry.stat() reuses the data from the directory scan,
+            # saving a stat syscall per file vs glob
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        size += entry.stat().st_size
+                        count += 1
+            return size, count
+
+        scans = await asyncio.gather(
+            *[
+                asyncio.to_thread(scan_dir, path)
+                for path in [self.sessions_path, self.responses_path, self.baselines_path]
+            ]
+        )
+        total_size = sum(size for size, _ in scans)
+        file_count = sum(count for _, count in scans)
+
         return {
             "total_sessions": self.metadata.get("total_sessions", 0),
             "total_responses": self.metadata.get("total_responses", 0),
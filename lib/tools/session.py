@@ -22,8 +22,9 @@ class SessionManager:
         self.storage_path = storage_path or Path("./sessions")
         self.storage_path.mkdir(exist_ok=True)
         self.sessions = {}
+        self._active_count = 0
         self._load_sessions()
-    
+
     def _load_sessions(self):
         """Load existing sessions from disk."""
         for session_file in self.storage_path.glob("*.json"):
@@ -31,6 +32,8 @@ class SessionManager:
                 with open(session_file, 'r') as f:
                     session = json.load(f)
                     self.sessions[session['id']] = session
+                    if session.get("status") == "active":
+                        self._active_count += 1
             except Exception as e:
                 logger.error(f"Failed to load session {session_file}: {e}")
     
@@ -47,6 +50,7 @@ class SessionManager:
             "pagination": pagination_settings or {}
         }
         self.sessions[session_id] = session
+        self._active_count += 1
         self._save_session(session_id)
         return session_id
     
@@ -86,9 +90,15 @@ class SessionManager:
         with open(session_file, 'w') as f:
             json.dump(session, f, indent=2)
     
+    def active_count(self) -> int:
+        """Number of active sessions, maintained as an O(1) counter."""
+        return self._active_count
+
     def close_session(self, session_id: str):
         """Mark a session as completed."""
         if session_id in self.sessions:
+            if self.sessions[session_id].get("status") == "active":
+                self._active_count -= 1
             self.sessions[session_id]["status"] = "completed"
             self.sessions[session_id]["updated_at"] = datetime.now().isoformat()
             self._save_session(session_id)